@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+DirectoryExplorer Benchmark
+DirectoryExplorer Ölçümü
+
+Tekrarlanabilir sentetik ağaçlar üretir ve DirectoryExplorer'ı farklı seçenek
+kombinasyonlarıyla ölçer:
+    - girdi/saniye
+    - tepe bellek (tracemalloc, ayrı bir geçişte)
+    - sistem çağrısı sayıları (scandir / stat, DirectoryExplorer.scan_stats)
+
+Ağaç şekilleri:
+    - wide       : az seviye, klasör başına çok öğe
+    - deep       : dar ama derin zincirler
+    - small_files: orta derinlikte çok sayıda küçük dosya
+    - skip_heavy : girdilerin büyük kısmı atlama desenlerine takılır
+
+Ağaçlar --work-dir altında (şekil, boyut) başına bir kez üretilir ve sonraki
+çalıştırmalarda yeniden kullanılır.
+
+Kullanım:
+    python benchmarks/bench_file_lister.py [--sizes 10k,100k] [--shapes wide,deep]
+                                           [--output results.json]
+                                           [--baseline baseline.json] [--tolerance 0.15]
+                                           [--save-baseline baseline.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modules'))
+from FileLister import DirectoryExplorer, TextTreeWriter  # noqa: E402
+
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+SHAPES = ['wide', 'deep', 'small_files', 'skip_heavy']
+SKIP_PATTERNS = ['*.tmp', '*.log', '__pycache__', 'node_modules']
+
+# Ölçülen seçenek kombinasyonları: (isim, DirectoryExplorer argümanları, tarama türü)
+SCENARIOS = [
+    ('names_only', dict(show_size=False, show_date=False), 'entries'),
+    ('size_date', dict(show_size=True, show_date=True), 'entries'),
+    ('size_date_count', dict(show_size=True, show_date=True, show_folder_count=True), 'entries'),
+    ('skip_patterns', dict(show_size=True, show_date=True, skip_patterns=SKIP_PATTERNS), 'entries'),
+    ('parallel_4', dict(show_size=True, show_date=True, workers=4), 'entries'),
+    ('indexed_warm', dict(show_size=False, show_date=False), 'indexed'),
+    ('indexed_trusted', dict(show_size=True, show_date=True, index_trust_stats=True), 'indexed'),
+    ('text_writer', dict(show_size=True, show_date=True, show_folder_count=True), 'text'),
+    ('du', dict(du_mode=True), 'du'),
+]
+
+
+def _shape_params(shape):
+    """Şekil için (dal sayısı, derinlik, klasör başına dosya) döndürür."""
+    return {
+        'wide': (40, 2, 200),
+        'deep': (2, 14, 4),
+        'small_files': (8, 4, 60),
+        'skip_heavy': (10, 3, 40),
+    }[shape]
+
+
+def generate_tree(root, shape, total, seed=42):
+    """
+    Verilen şekilde yaklaşık `total` girdili bir ağaç üretir.
+    
+    Klasörler genişlik öncelikli oluşturulur ve bütçe dolduğunda durulur; aynı
+    tohumla her zaman aynı ağaç elde edilir. Üretilen girdi sayısını döndürür.
+    """
+    rng = random.Random(seed)
+    branches, max_depth, files_per_dir = _shape_params(shape)
+    os.makedirs(root, exist_ok=True)
+    created = 0
+    queue = [(root, 0)]
+    while queue and created < total:
+        next_queue = []
+        for dir_path, depth in queue:
+            for i in range(files_per_dir):
+                if created >= total:
+                    break
+                if shape == 'skip_heavy' and i % 4 != 0:
+                    name = f"f{i}.{rng.choice(['tmp', 'log'])}"
+                else:
+                    name = f"f{i}.{rng.choice(['py', 'txt', 'md', 'json'])}"
+                with open(os.path.join(dir_path, name), 'wb') as f:
+                    f.write(b'x' * rng.randint(0, 512))
+                created += 1
+            if depth >= max_depth:
+                continue
+            for i in range(branches):
+                if created >= total:
+                    break
+                if shape == 'skip_heavy' and i < 2:
+                    name = ['__pycache__', 'node_modules'][i]
+                else:
+                    name = f"d{i}"
+                child = os.path.join(dir_path, name)
+                os.mkdir(child)
+                created += 1
+                next_queue.append((child, depth + 1))
+        queue = next_queue
+        # Derin ağaçta bütçe dolmadan seviye biterse yeni bir zincir başlat
+        if not queue and created < total:
+            extra = os.path.join(root, f"more{created}")
+            os.mkdir(extra)
+            created += 1
+            queue = [(extra, 0)]
+    return created
+
+
+def ensure_tree(work_dir, shape, size_label):
+    """Ağacı gerekirse üretir; tamamlandığını gösteren işaret dosyası ile yeniden kullanır."""
+    root = os.path.join(work_dir, f"{shape}_{size_label}")
+    marker = os.path.join(work_dir, f".{shape}_{size_label}.done")
+    if os.path.exists(marker):
+        with open(marker, encoding='utf-8') as f:
+            return root, int(f.read().strip() or 0)
+    if os.path.exists(root):
+        raise SystemExit(f"Yarım kalmış ağaç bulundu, silip tekrar deneyin: {root}")
+    print(f"Ağaç üretiliyor: {shape} / {size_label} ...", file=sys.stderr)
+    created = generate_tree(root, shape, SIZES[size_label])
+    with open(marker, 'w', encoding='utf-8') as f:
+        f.write(str(created))
+    return root, created
+
+
+def _scan_once(root, options, kind, work_dir):
+    """Senaryoyu bir kez çalıştırır; (kayıt sayısı, explorer) döndürür."""
+    if kind == 'du':
+        explorer = DirectoryExplorer(root_path=root, auto_run=False, **options)
+        return sum(1 for _ in explorer.iter_disk_usage()), explorer
+    if kind == 'indexed':
+        # Boyut/tarih saklayan indeks ayrı dosyadadır; diğer senaryonun kayıtlarını kullanmaz
+        suffix = '.trusted' if options.get('index_trust_stats') else ''
+        index_path = os.path.join(work_dir, f"{os.path.basename(root)}{suffix}.index")
+        explorer = DirectoryExplorer(root_path=root, index_path=index_path, auto_run=False, **options)
+        return sum(1 for _ in explorer.iter_entries()), explorer
+    if kind == 'text':
+        out_path = os.path.join(work_dir, 'bench_output.txt')
+        explorer = DirectoryExplorer(root_path=root, auto_run=False,
+                                     writers=[TextTreeWriter(out_path, echo=False)], **options)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            explorer.run()
+        return explorer.scan_stats['entries'], explorer
+    explorer = DirectoryExplorer(root_path=root, auto_run=False, **options)
+    return sum(1 for _ in explorer.iter_entries()), explorer
+
+
+def run_scenario(root, name, options, kind, work_dir, repeat, measure_memory):
+    """Senaryoyu ölçer; en iyi süreyi ve son geçişin çağrı sayılarını döndürür."""
+    if kind == 'indexed':
+        # İndeksi ısıt; ölçülen geçişler yalnızca indeks isabetlerini görür
+        _scan_once(root, options, kind, work_dir)
+    
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records, explorer = _scan_once(root, options, kind, work_dir)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    
+    peak = None
+    if measure_memory:
+        tracemalloc.start()
+        _scan_once(root, options, kind, work_dir)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    
+    stats = explorer.scan_stats
+    return {
+        'scenario': name,
+        'records': records,
+        'seconds': round(best, 4),
+        'entries_per_sec': round(stats['entries'] / best, 1) if best else None,
+        'peak_memory_bytes': peak,
+        'scandir_calls': stats['scandir'],
+        'stat_calls': stats['stat'],
+        'index_hits': stats['index_hits'],
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Sonuçları temel ölçümle karşılaştırır; gerileyen satırların listesini döndürür."""
+    base = {(r['shape'], r['size'], r['scenario']): r for r in baseline.get('results', [])}
+    regressions = []
+    for row in results:
+        ref = base.get((row['shape'], row['size'], row['scenario']))
+        if not ref:
+            continue
+        row['baseline_entries_per_sec'] = ref['entries_per_sec']
+        if ref['entries_per_sec'] and row['entries_per_sec']:
+            row['change'] = round(row['entries_per_sec'] / ref['entries_per_sec'] - 1, 3)
+            if row['change'] < -tolerance:
+                regressions.append(row)
+        # Çağrı sayıları deterministiktir; artış her zaman gerilemedir
+        if row['scandir_calls'] + row['stat_calls'] > ref['scandir_calls'] + ref['stat_calls']:
+            row['syscall_regression'] = True
+            if row not in regressions:
+                regressions.append(row)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DirectoryExplorer performans ölçümü")
+    parser.add_argument('--sizes', default='10k', help="Virgülle ayrılmış boyutlar: 10k,100k,1m")
+    parser.add_argument('--shapes', default=','.join(SHAPES), help="Virgülle ayrılmış ağaç şekilleri")
+    parser.add_argument('--scenarios', default=None, help="Yalnızca verilen senaryolar (virgülle)")
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'file_lister_bench'),
+                        help="Sentetik ağaçların üretileceği klasör")
+    parser.add_argument('--repeat', type=int, default=3, help="Senaryo başına tekrar (en iyisi alınır)")
+    parser.add_argument('--no-memory', action='store_true', help="Tepe bellek ölçümünü atla")
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--baseline', help="Karşılaştırılacak temel ölçüm JSON dosyası")
+    parser.add_argument('--save-baseline', help="Sonuçları temel ölçüm olarak kaydet")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="İzin verilen girdi/saniye düşüşü (0.15 = %%15)")
+    parser.add_argument('--json', action='store_true', help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+    
+    sizes = [s.strip().lower() for s in args.sizes.split(',') if s.strip()]
+    shapes = [s.strip() for s in args.shapes.split(',') if s.strip()]
+    for label in sizes:
+        if label not in SIZES:
+            parser.error(f"Bilinmeyen boyut: {label}")
+    for shape in shapes:
+        if shape not in SHAPES:
+            parser.error(f"Bilinmeyen şekil: {shape}")
+    scenarios = SCENARIOS
+    if args.scenarios:
+        wanted = {s.strip() for s in args.scenarios.split(',')}
+        scenarios = [s for s in SCENARIOS if s[0] in wanted]
+    
+    os.makedirs(args.work_dir, exist_ok=True)
+    results = []
+    for size_label in sizes:
+        for shape in shapes:
+            root, created = ensure_tree(args.work_dir, shape, size_label)
+            for name, options, kind in scenarios:
+                row = run_scenario(root, name, options, kind, args.work_dir, args.repeat, not args.no_memory)
+                row.update(shape=shape, size=size_label, tree_entries=created)
+                results.append(row)
+                if not args.json:
+                    print(f"{shape:<12}{size_label:<6}{name:<18}{row['entries_per_sec']:>14,.0f} e/s"
+                          f"{row['scandir_calls']:>9} scandir{row['stat_calls']:>9} stat"
+                          + (f"{row['peak_memory_bytes'] / 1024 / 1024:>9.1f} MB" if row['peak_memory_bytes'] else ""),
+                          file=sys.stderr)
+    
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    
+    report = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+        'regressions': [(r['shape'], r['size'], r['scenario']) for r in regressions],
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    
+    if regressions:
+        for row in regressions:
+            print(f"GERİLEME: {row['shape']} / {row['size']} / {row['scenario']} "
+                  f"({row.get('change', 0):+.1%}, temel {row['baseline_entries_per_sec']:,.0f} e/s)",
+                  file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+OllamaChat Benchmark
+OllamaChat Ölçümü
+
+Süreç içinde çalışan sahte bir Ollama HTTP sunucusu (/api/tags, /api/generate,
+/api/chat) başlatır ve OllamaChat'in istemci tarafı maliyetini ölçer:
+    - gecikme p50 / p99
+    - istek/saniye
+    - istek başına istemci CPU süresi (sunucu iş parçacıklarının CPU'su düşülür)
+
+Sunucunun gecikmesi, token hızı ve yanıt uzunluğu ayarlanabilir; varsayılan
+değerler (0 gecikme, anında tokenlar) ölçümü bağlantı yönetimi ve ayrıştırma
+maliyetine odaklar, böylece bu alanlardaki gerilemeler görünür olur.
+
+Senaryolar:
+    - send_message : aynı örnekle ardışık send_message çağrıları
+    - cold_instance: her istek için yeni OllamaChat (sağlık kontrolü + yeni bağlantı)
+    - stream       : stream_message tamamen tüketilir (ilk token süresi de raporlanır)
+    - batch        : send_batch, --concurrency eşzamanlı istek
+    - conversation : Conversation.send ile çok turlu sohbet (/api/chat)
+
+Kullanım:
+    python benchmarks/bench_ollama_chat.py [--requests 200] [--concurrency 4] [--repeat 3]
+                                           [--latency 0] [--token-rate 0] [--tokens 32]
+                                           [--output results.json]
+                                           [--baseline baseline.json] [--tolerance 0.2]
+                                           [--save-baseline baseline.json]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modules'))
+from ollama_chat import OllamaChat  # noqa: E402
+
+
+SCENARIOS = ['send_message', 'cold_instance', 'stream', 'batch', 'conversation']
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Ollama API'sinin ölçüm için yeterli alt kümesi."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True      # Başlık ve gövde ayrı yazılır; Nagle her isteğe ~40 ms ekler
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def handle_one_request(self):
+        # Sunucu iş parçacıklarının CPU süresi istemci ölçümünden düşülür
+        start = time.thread_time()
+        try:
+            super().handle_one_request()
+        finally:
+            self.server.add_cpu(time.thread_time() - start)
+    
+    def _send_json(self, obj, status=200):
+        body = json.dumps(obj).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _tokens(self):
+        """Yapılandırılmış gecikme ve hızla yanıt tokenlarını üretir."""
+        config = self.server.config
+        if config['latency']:
+            time.sleep(config['latency'])
+        for i in range(config['tokens']):
+            if config['token_rate']:
+                time.sleep(1 / config['token_rate'])
+            yield f"tok{i} "
+    
+    def _final_fields(self, prompt_tokens):
+        tokens = self.server.config['tokens']
+        return {'done': True, 'prompt_eval_count': prompt_tokens, 'eval_count': tokens,
+                'total_duration': 0, 'eval_duration': 0}
+    
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._send_json({'models': [{'name': self.server.config['model']}]})
+        else:
+            self._send_json({'error': 'not found'}, 404)
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if self.path == '/api/generate':
+            prompt = request.get('prompt')
+            if not prompt:
+                # Boş istem: modeli yükle (warm-up)
+                self._send_json({'model': request.get('model'), 'response': '', 'done': True})
+                return
+            prompt_tokens = len(prompt.split())
+            wrap = lambda text: {'response': text, 'done': False}
+        elif self.path == '/api/chat':
+            prompt_tokens = sum(len(m.get('content', '').split()) for m in request.get('messages', []))
+            wrap = lambda text: {'message': {'role': 'assistant', 'content': text}, 'done': False}
+        else:
+            self._send_json({'error': 'not found'}, 404)
+            return
+        
+        if not request.get('stream', True):
+            text = ''.join(self._tokens())
+            final = wrap(text)
+            final.update(self._final_fields(prompt_tokens))
+            self._send_json(final)
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for text in self._tokens():
+                self._write_chunk(wrap(text))
+            final = wrap('')
+            final.update(self._final_fields(prompt_tokens))
+            self._write_chunk(final)
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            # İstemci akışı iptal etti
+            self.close_connection = True
+    
+    def _write_chunk(self, obj):
+        line = json.dumps(obj).encode('utf-8') + b'\n'
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, latency=0.0, token_rate=0.0, tokens=32, model='bench-model'):
+        super().__init__(('127.0.0.1', 0), FakeOllamaHandler)
+        self.config = {'latency': latency, 'token_rate': token_rate, 'tokens': tokens, 'model': model}
+        self.cpu_seconds = 0.0
+        self._cpu_lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-ollama', daemon=True)
+    
+    @property
+    def host(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+    
+    def handle_error(self, request, client_address):
+        # cold_instance her oturumu kapatır; istemcinin kestiği bağlantılar beklenen durumdur
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+    
+    def add_cpu(self, seconds):
+        with self._cpu_lock:
+            self.cpu_seconds += seconds
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def _percentile(sorted_values, pct):
+    """Sıralı listenin en yakın sıra yüzdeliği."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+
+def _new_chat(server, history_path):
+    # OllamaChat başlatırken konsola yazar; ölçüm çıktısını kirletmesin
+    with contextlib.redirect_stdout(io.StringIO()):
+        return OllamaChat(model=server.config['model'], host=server.host, history=history_path)
+
+
+def _run(name, server, history_path, requests, concurrency):
+    """Senaryoyu çalıştırır; (istek gecikmeleri, hata sayısı, ek alanlar) döndürür."""
+    latencies, errors, extra = [], 0, {}
+    
+    if name == 'cold_instance':
+        for i in range(requests):
+            start = time.perf_counter()
+            chat = _new_chat(server, history_path)
+            if not chat.send_message(f"cold prompt {i}"):
+                errors += 1
+            chat.close()
+            latencies.append(time.perf_counter() - start)
+        return latencies, errors, extra
+    
+    chat = _new_chat(server, history_path)
+    try:
+        if name == 'send_message':
+            for i in range(requests):
+                start = time.perf_counter()
+                if not chat.send_message(f"prompt {i}"):
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+        elif name == 'stream':
+            ttfts = []
+            for i in range(requests):
+                start = time.perf_counter()
+                stream = chat.stream_message(f"stream prompt {i}")
+                if not stream.text():
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+                if stream.stats.get('ttft') is not None:
+                    ttfts.append(stream.stats['ttft'])
+            ttfts.sort()
+            extra['ttft_p50_ms'] = round(_percentile(ttfts, 50) * 1000, 3) if ttfts else None
+        elif name == 'batch':
+            results, stats = chat.send_batch([f"batch prompt {i}" for i in range(requests)], max_workers=concurrency)
+            latencies = [r['latency'] for r in results]
+            errors = stats['errors']
+            extra['wall_seconds'] = stats['wall_time']
+        elif name == 'conversation':
+            conversation = chat.conversation("You are a benchmark.")
+            for i in range(requests):
+                start = time.perf_counter()
+                if not conversation.send(f"turn {i}"):
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            chat.close()
+    return latencies, errors, extra
+
+
+def run_scenario(name, server, history_path, requests, concurrency):
+    """Senaryoyu ölçer: gecikme yüzdelikleri, istek/saniye ve istek başına istemci CPU'su."""
+    cpu_start, server_cpu_start = time.process_time(), server.cpu_seconds
+    wall_start = time.perf_counter()
+    latencies, errors, extra = _run(name, server, history_path, requests, concurrency)
+    wall = extra.pop('wall_seconds', None) or (time.perf_counter() - wall_start)
+    client_cpu = (time.process_time() - cpu_start) - (server.cpu_seconds - server_cpu_start)
+    
+    latencies.sort()
+    row = {
+        'scenario': name,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 3) if latencies else None,
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 3) if latencies else None,
+        'requests_per_sec': round(len(latencies) / wall, 1) if wall else None,
+        'cpu_ms_per_request': round(max(client_cpu, 0.0) * 1000 / len(latencies), 3) if latencies else None,
+    }
+    row.update(extra)
+    return row
+
+
+def compare(results, baseline, tolerance):
+    """Sonuçları temel ölçümle karşılaştırır; gerileyen satırların listesini döndürür."""
+    base = {r['scenario']: r for r in baseline.get('results', [])}
+    regressions = []
+    for row in results:
+        ref = base.get(row['scenario'])
+        if not ref:
+            continue
+        row['baseline_requests_per_sec'] = ref['requests_per_sec']
+        row['baseline_cpu_ms_per_request'] = ref['cpu_ms_per_request']
+        if ref['requests_per_sec'] and row['requests_per_sec']:
+            row['change'] = round(row['requests_per_sec'] / ref['requests_per_sec'] - 1, 3)
+            if row['change'] < -tolerance:
+                regressions.append(row)
+        if ref['cpu_ms_per_request'] and row['cpu_ms_per_request']:
+            row['cpu_change'] = round(row['cpu_ms_per_request'] / ref['cpu_ms_per_request'] - 1, 3)
+            if row['cpu_change'] > tolerance and row not in regressions:
+                regressions.append(row)
+        # Sahte sunucu hata üretmez; her hata bir gerilemedir
+        if row['errors'] > ref.get('errors', 0) and row not in regressions:
+            regressions.append(row)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OllamaChat istemci performans ölçümü")
+    parser.add_argument('--requests', type=int, default=200, help="Senaryo başına istek sayısı")
+    parser.add_argument('--concurrency', type=int, default=4, help="batch senaryosunda eşzamanlı istek")
+    parser.add_argument('--repeat', type=int, default=3, help="Senaryo başına tekrar (en yüksek istek/saniye alınır)")
+    parser.add_argument('--scenarios', default=None, help="Yalnızca verilen senaryolar (virgülle)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Sahte sunucunun ilk token öncesi gecikmesi (saniye)")
+    parser.add_argument('--token-rate', type=float, default=0.0, help="Sahte sunucunun token/saniye hızı (0 = anında)")
+    parser.add_argument('--tokens', type=int, default=32, help="Yanıt başına token sayısı")
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--baseline', help="Karşılaştırılacak temel ölçüm JSON dosyası")
+    parser.add_argument('--save-baseline', help="Sonuçları temel ölçüm olarak kaydet")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="İzin verilen istek/saniye düşüşü ve CPU artışı (0.2 = %%20)")
+    parser.add_argument('--json', action='store_true', help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+    
+    scenarios = SCENARIOS
+    if args.scenarios:
+        wanted = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+        for name in wanted:
+            if name not in SCENARIOS:
+                parser.error(f"Bilinmeyen senaryo: {name}")
+        scenarios = [s for s in SCENARIOS if s in wanted]
+    
+    server = FakeOllamaServer(args.latency, args.token_rate, args.tokens).start()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        history_path = os.path.join(tmp, 'bench_history.jsonl')
+        try:
+            for name in scenarios:
+                runs = [run_scenario(name, server, history_path, args.requests, args.concurrency)
+                        for _ in range(max(1, args.repeat))]
+                row = max(runs, key=lambda r: r['requests_per_sec'] or 0)
+                results.append(row)
+                if not args.json:
+                    print(f"{name:<15}{row['requests_per_sec']:>10,.1f} req/s"
+                          f"{row['p50_ms']:>10.2f} ms p50{row['p99_ms']:>10.2f} ms p99"
+                          f"{row['cpu_ms_per_request']:>9.3f} ms CPU/req"
+                          + (f"{row['errors']:>6} err" if row['errors'] else ""),
+                          file=sys.stderr)
+        finally:
+            server.stop()
+    
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('server') != {'latency': args.latency, 'token_rate': args.token_rate, 'tokens': args.tokens}:
+            print(f"UYARI: temel ölçüm farklı sunucu ayarlarıyla alınmış: {baseline.get('server')}", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+    
+    report = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'server': {'latency': args.latency, 'token_rate': args.token_rate, 'tokens': args.tokens},
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'repeat': args.repeat,
+        'results': results,
+        'regressions': [r['scenario'] for r in regressions],
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    
+    if regressions:
+        for row in regressions:
+            print(f"GERİLEME: {row['scenario']} "
+                  f"({row.get('change', 0):+.1%} req/s, {row.get('cpu_change', 0):+.1%} CPU, "
+                  f"temel {row['baseline_requests_per_sec']:,.1f} req/s)",
+                  file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
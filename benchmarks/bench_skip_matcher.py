@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Skip Pattern Benchmark
+Atlama Deseni Ölçümü
+
+Desen sayısı arttıkça girdi başına eşleştirme maliyetini ölçer:
+    - legacy  : eski _should_skip (os.path.relpath + desen başına iki fnmatch)
+    - compiled: DirectoryExplorer'ın kullandığı derlenmiş SkipMatcher
+
+Kullanım:
+    python benchmarks/bench_skip_matcher.py [--entries 50000] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import fnmatch
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modules'))
+from FileLister import SkipMatcher  # noqa: E402
+
+
+PATTERN_COUNTS = [1, 5, 10, 30, 100]
+
+
+def make_patterns(count):
+    """Gerçekçi bir karışımla (uzantı, isim, yol) desen listesi üretir."""
+    base = ['*.tmp', '*.log', '__pycache__', 'node_modules', '*.pyc', 'build/', 'dist/*', '.venv']
+    patterns = []
+    for i in range(count):
+        if i < len(base):
+            patterns.append(base[i])
+        elif i % 3 == 0:
+            patterns.append(f"*.ext{i}")
+        elif i % 3 == 1:
+            patterns.append(f"name_{i}")
+        else:
+            patterns.append(f"dir{i}/*.dat")
+    return patterns
+
+
+def make_entries(count, root):
+    """(isim, tam yol, göreli klasör, is_dir) dörtlüleri üretir."""
+    rng = random.Random(42)
+    exts = ['.py', '.txt', '.log', '.tmp', '.dat', '.md']
+    entries = []
+    for i in range(count):
+        depth = rng.randint(0, 6)
+        rel_dir = '/'.join(f"d{rng.randint(0, 20)}" for _ in range(depth))
+        is_dir = rng.random() < 0.15
+        name = f"item{i}" if is_dir else f"file{i}{rng.choice(exts)}"
+        full = os.path.join(root, *rel_dir.split('/'), name) if rel_dir else os.path.join(root, name)
+        entries.append((name, full, rel_dir, is_dir))
+    return entries
+
+
+def legacy_should_skip(patterns, root, name, path):
+    rel_path = os.path.relpath(path, root)
+    for pattern in patterns:
+        if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern):
+            return True
+    return False
+
+
+def bench(entries, patterns, root):
+    """Her yöntem için girdi başına nanosaniye döndürür."""
+    start = time.perf_counter_ns()
+    legacy_hits = sum(1 for name, full, _, _ in entries if legacy_should_skip(patterns, root, name, full))
+    legacy_ns = (time.perf_counter_ns() - start) / len(entries)
+    
+    matcher = SkipMatcher(patterns)
+    start = time.perf_counter_ns()
+    compiled_hits = 0
+    for name, _, rel_dir, is_dir in entries:
+        rel_path = f"{rel_dir}/{name}" if rel_dir and matcher.needs_path else name
+        if matcher.match(name, rel_path, is_dir):
+            compiled_hits += 1
+    compiled_ns = (time.perf_counter_ns() - start) / len(entries)
+    
+    return {
+        'patterns': len(patterns),
+        'legacy_ns_per_entry': round(legacy_ns, 1),
+        'compiled_ns_per_entry': round(compiled_ns, 1),
+        'speedup': round(legacy_ns / compiled_ns, 2) if compiled_ns else None,
+        'legacy_hits': legacy_hits,
+        'compiled_hits': compiled_hits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SkipMatcher desen sayısı ölçümü")
+    parser.add_argument('--entries', type=int, default=50000, help="Ölçülecek girdi sayısı")
+    parser.add_argument('--json', action='store_true', help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+    
+    root = os.path.abspath(os.sep + 'bench_root')
+    entries = make_entries(args.entries, root)
+    results = [bench(entries, make_patterns(count), root) for count in PATTERN_COUNTS]
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    print(f"{'PATTERNS':<10}{'LEGACY ns':<14}{'COMPILED ns':<14}{'SPEEDUP':<10}")
+    print('-' * 48)
+    for row in results:
+        print(f"{row['patterns']:<10}{row['legacy_ns_per_entry']:<14}{row['compiled_ns_per_entry']:<14}{row['speedup']:<10}")
+
+
+if __name__ == "__main__":
+    main()
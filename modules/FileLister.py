@@ -7,8 +7,737 @@ Bu araç, belirtilen dizin yapısını analiz eder ve detaylı bilgilerle sunar.
 """
 
 import os
+import re
+import csv
+import json
+import time
+import struct
+import sqlite3
+import heapq
+import shutil
+import tempfile
+import errno
+import select
 import datetime
-import fnmatch
+import threading
+from collections import namedtuple, deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import ctypes
+    import ctypes.util
+    _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    _libc.inotify_init1
+    INOTIFY_AVAILABLE = True
+except (ImportError, OSError, AttributeError):
+    INOTIFY_AVAILABLE = False
+
+
+# Tarama sırasında üretilen yapılandırılmış kayıt.
+# kind: 'dir', 'file', 'more' (gösterilmeyen öğelerin özeti) veya 'error'.
+# size/mtime toplanmadıysa None; count yalnızca klasör ve 'more' kayıtlarında dolu.
+ExplorerEntry = namedtuple(
+    'ExplorerEntry',
+    ['kind', 'path', 'name', 'depth', 'is_dir', 'size', 'mtime', 'count', 'message']
+)
+
+# du modunda klasör başına üretilen toplam: size (bayt), allocated (diskte ayrılan bayt),
+# files (alt ağaçtaki dosya sayısı). Kayıtlar alt klasörlerden üst klasöre doğru üretilir.
+DiskUsage = namedtuple('DiskUsage', ['path', 'rel_path', 'depth', 'size', 'allocated', 'files'])
+
+# İzleme modunda üretilen değişiklik. kind: 'added', 'removed' veya 'modified'.
+# size/mtime yalnızca dosyalarda dolu; 'removed' için son bilinen değerlerdir.
+WatchEvent = namedtuple('WatchEvent', ['kind', 'path', 'rel_path', 'is_dir', 'size', 'mtime'])
+
+
+class SkipMatcher:
+    """
+    skip_patterns listesini bir kez derleyen, gitignore benzeri desen eşleştirici.
+    
+    Kurallar:
+        - '/' içermeyen desen her seviyede yalnızca isimle eşleşir ('*.log', '__pycache__')
+        - '/' içeren desen köke göre göreli yolla eşleşir ('build/out', 'docs/*.md');
+          baştaki '/' deseni köke sabitler ('/dist')
+        - Sonda '/' olan desen yalnızca klasörlerle eşleşir ('cache/')
+        - '!' ile başlayan desen, önceki kuralların atladığı öğeyi geri alır
+        - '*' ve '?' klasör ayırıcısını aşmaz; '**' aşar ('**/tmp', 'logs/**')
+    
+    Birden çok kural eşleşirse sondaki kazanır. '!' kuralı yoksa tüm desenler
+    isim/yol ve klasör/dosya gruplarına göre tek bir düzenli ifadede birleştirilir.
+    """
+    
+    def __init__(self, patterns):
+        self.patterns = list(patterns or [])
+        flags = re.IGNORECASE if os.name == 'nt' else 0
+        
+        # (regex, yol_mu, sadece_klasör, geri_al)
+        self._rules = []
+        for pattern in self.patterns:
+            negate = pattern.startswith('!')
+            if negate:
+                pattern = pattern[1:]
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            if not pattern:
+                continue
+            on_path = '/' in pattern
+            regex = self._glob_to_regex(pattern.lstrip('/'))
+            self._rules.append((regex, on_path, dir_only, negate))
+        
+        self._ordered = any(rule[3] for rule in self._rules)
+        # Göreli yol yalnızca yol desenleri varsa gerekir
+        self.needs_path = any(rule[1] for rule in self._rules)
+        if self._ordered:
+            self._compiled = [(re.compile(regex, flags), on_path, dir_only, negate)
+                              for regex, on_path, dir_only, negate in self._rules]
+        else:
+            self._name_re = self._combine([r for r in self._rules if not r[1] and not r[2]], flags)
+            self._path_re = self._combine([r for r in self._rules if r[1] and not r[2]], flags)
+            self._dir_name_re = self._combine([r for r in self._rules if not r[1] and r[2]], flags)
+            self._dir_path_re = self._combine([r for r in self._rules if r[1] and r[2]], flags)
+    
+    def __bool__(self):
+        return bool(self._rules)
+    
+    @staticmethod
+    def _combine(rules, flags):
+        if not rules:
+            return None
+        return re.compile('|'.join(f"(?:{rule[0]})" for rule in rules), flags)
+    
+    @staticmethod
+    def _glob_to_regex(pattern):
+        """Glob desenini '/' ayırıcısına saygılı düzenli ifadeye çevirir."""
+        i, n = 0, len(pattern)
+        out = []
+        while i < n:
+            c = pattern[i]
+            if c == '*':
+                if pattern.startswith('**', i):
+                    i += 2
+                    if i < n and pattern[i] == '/':
+                        # '**/' sıfır veya daha fazla klasör
+                        i += 1
+                        out.append('(?:.*/)?')
+                    else:
+                        out.append('.*')
+                    continue
+                out.append('[^/]*')
+            elif c == '?':
+                out.append('[^/]')
+            elif c == '[':
+                # '[!' ve hemen ardından gelen ']' sınıfın parçasıdır
+                j = i + 1
+                if j < n and pattern[j] == '!':
+                    j += 1
+                if j < n and pattern[j] == ']':
+                    j += 1
+                j = pattern.find(']', j)
+                if j == -1:
+                    out.append('\\[')
+                else:
+                    body = pattern[i + 1:j].replace('\\', '\\\\')
+                    if body.startswith('!'):
+                        body = '^' + body[1:]
+                    elif body.startswith('^'):
+                        body = '\\' + body
+                    out.append(f"[{body}]")
+                    i = j
+            else:
+                out.append(re.escape(c))
+            i += 1
+        return ''.join(out)
+    
+    def match(self, name, rel_path, is_dir):
+        """Öğenin atlanıp atlanmayacağını döndürür (rel_path '/' ayırıcılı, köke göreli)."""
+        if not self._ordered:
+            if self._name_re is not None and self._name_re.fullmatch(name):
+                return True
+            if self._path_re is not None and self._path_re.fullmatch(rel_path):
+                return True
+            if is_dir:
+                if self._dir_name_re is not None and self._dir_name_re.fullmatch(name):
+                    return True
+                if self._dir_path_re is not None and self._dir_path_re.fullmatch(rel_path):
+                    return True
+            return False
+        
+        for regex, on_path, dir_only, negate in reversed(self._compiled):
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(rel_path if on_path else name):
+                return not negate
+        return False
+
+
+# İndekste saklanan boyut/tarih (ScanIndex trust_stats); os.stat_result yerine kullanılır
+_IndexedStat = namedtuple('_IndexedStat', ['st_size', 'st_mtime'])
+
+
+class _CachedEntry:
+    """İndeksten okunan ve os.DirEntry arayüzünü taklit eden girdi."""
+    
+    __slots__ = ('name', 'path', '_is_dir', '_is_symlink', '_stat')
+    
+    def __init__(self, path, name, is_dir, is_symlink, stat=None):
+        self.name = name
+        self.path = path
+        self._is_dir = is_dir
+        self._is_symlink = is_symlink
+        self._stat = stat
+    
+    def is_dir(self):
+        return self._is_dir
+    
+    def is_symlink(self):
+        return self._is_symlink
+    
+    def stat(self):
+        # Dosya içeriği değişince klasör mtime'ı değişmez; indeks boyut/tarih saklamıyorsa diskten okunur
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+
+class ScanIndex:
+    """
+    Son taramanın klasör listelerini sqlite dosyasında saklayan kalıcı indeks.
+    
+    Her klasör için mtime (ns) ve ham girdi listesi (isim + tür bayrakları) tutulur.
+    Klasörün mtime'ı değişmediyse listesi scandir yapılmadan indeksten kullanılır; bu,
+    her listelemenin sunucuya gidip geldiği yavaş veya ağ (NFS, SMB) dosya sistemlerinde
+    kazanç sağlar. Yerel diskte, önbellek sıcakken scandir zaten ucuzdur ve indeks
+    tek başına taramayı hızlandırmaz.
+    
+    Kayıtlar belleğe alınmaz: anahtarda yol ayırıcısı en küçük karakterle değiştirildiği
+    için anahtar sırası taramanın gezinme sırasıdır (klasör, sonra isme göre alt ağaçlar).
+    Kayıtlar tek bir sıralı sorgudan tarama ilerledikçe okunur; sıra dışı istekler
+    (paralel tarama) tek kayıtlık sorguyla karşılanır. Atlama desenleri liste okunduktan
+    sonra uygulandığı için desen değişiklikleri indeksi geçersiz kılmaz.
+    
+    Her tarama okuduğu kayıtları kendi numarasıyla işaretler; tamamlanan taramadan sonra
+    prune() ile o taramada görülmeyen (silinmiş veya artık gezilmeyen) klasörlerin
+    kayıtları silinir.
+    
+    trust_stats açıksa girdilerin boyut ve tarihleri de saklanır ve mtime'ı değişmeyen
+    klasörlerde dosyalar stat edilmez. Dosya yerinde değiştirildiğinde klasörün mtime'ı
+    değişmediği için bu değerler, klasöre öğe eklenip silinene kadar eski kalabilir;
+    bu yüzden varsayılan olarak kapalıdır.
+    """
+    
+    # Bu süreden yeni mtime'lı klasörler kaydedilmez (aynı zaman dilimindeki değişiklikler kaçabilir)
+    RACY_WINDOW_NS = 2_000_000_000
+    FLUSH_EVERY = 1000
+    # Anahtarda yol ayırıcısının yerine geçen karakter (dosya adlarında geçebilecek her karakterden küçük)
+    KEY_SEP = '\x01'
+    _decode = staticmethod(json.JSONDecoder().raw_decode)
+    
+    def __init__(self, index_path, trust_stats=False):
+        self.index_path = index_path
+        self.trust_stats = trust_stats
+        self._lock = threading.Lock()
+        self._pending = []
+        self._touched = []
+        self._stream = None
+        self._head = None
+        self._furthest = None
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        # Eski biçimdeki (yol sıralı) indeks yalnızca önbellektir; yeniden oluşturulur
+        self._conn.execute("DROP TABLE IF EXISTS dirs")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            "key TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, entries TEXT NOT NULL, scan INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._scan = self._conn.execute("SELECT COALESCE(MAX(scan), 0) + 1 FROM listings").fetchone()[0]
+        self._conn.commit()
+    
+    def _key(self, dir_path):
+        return dir_path.replace(os.sep, self.KEY_SEP)
+    
+    def _read_locked(self, key):
+        """Anahtarın (mtime_ns, entries) kaydını sıralı akıştan, sıra dışıysa tek sorguyla okur."""
+        if self._furthest is not None and key < self._furthest:
+            return self._conn.execute("SELECT mtime_ns, entries FROM listings WHERE key = ?", (key,)).fetchone()
+        if self._stream is None:
+            self._stream = self._conn.execute(
+                "SELECT key, mtime_ns, entries FROM listings WHERE key >= ? ORDER BY key", (key,))
+            self._head = self._stream.fetchone()
+        self._furthest = key
+        # Aradaki kayıtlar bu taramada istenmeyen (atlanan veya silinen) klasörlerindir
+        while self._head is not None and self._head[0] < key:
+            self._head = self._stream.fetchone()
+        if self._head is None or self._head[0] != key:
+            return None
+        row, self._head = self._head, self._stream.fetchone()
+        return row[1:]
+    
+    def lookup(self, dir_path, mtime_ns):
+        """mtime eşleşirse klasörün [(girdi, is_dir), ...] listesini, yoksa None döndürür."""
+        key = self._key(dir_path)
+        with self._lock:
+            row = self._read_locked(key)
+            if row is None or row[0] != mtime_ns:
+                return None
+            self._touched.append((self._scan, key))
+            if len(self._touched) >= self.FLUSH_EVERY:
+                self._flush_locked()
+        prefix = dir_path if dir_path.endswith(os.sep) else dir_path + os.sep
+        trust_stats = self.trust_stats
+        result = []
+        # Klasör başına json.loads sarmalayıcısı yerine doğrudan C ayrıştırıcısı
+        for item in self._decode(row[1])[0]:
+            name, flags = item[0], item[1]
+            is_dir = bool(flags & 1)
+            stat = _IndexedStat(item[2], item[3]) if trust_stats and len(item) == 4 else None
+            result.append((_CachedEntry(prefix + name, name, is_dir, bool(flags & 2), stat), is_dir))
+        return result
+    
+    def store(self, dir_path, mtime_ns, entries):
+        """Klasörün ham listesini (trust_stats açıksa boyut/tarihlerle) kaydedilmek üzere sıraya ekler."""
+        now_ns = time.time_ns()
+        if now_ns - mtime_ns < self.RACY_WINDOW_NS:
+            return
+        items = []
+        for entry, is_dir in entries:
+            item = [entry.name, (1 if is_dir else 0) | (2 if entry.is_symlink() else 0)]
+            if self.trust_stats:
+                # Stat DirEntry'de önbelleklenir; boyut/tarih gösterilirken tekrar çağrılmaz
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    stat = None
+                if stat is not None:
+                    if now_ns - stat.st_mtime_ns < self.RACY_WINDOW_NS:
+                        return
+                    item += [stat.st_size, stat.st_mtime]
+            items.append(item)
+        encoded = json.dumps(items, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._pending.append((self._key(dir_path), mtime_ns, encoded, self._scan))
+            if len(self._pending) >= self.FLUSH_EVERY:
+                self._flush_locked()
+    
+    def prune(self, root_path):
+        """root_path altında bu taramada görülmeyen klasörlerin kayıtlarını siler; silinen sayıyı döndürür."""
+        root_key = self._key(root_path)
+        # Alt klasör anahtarları prefix ile başlar: [prefix, son karakteri bir artırılmış prefix) aralığı
+        prefix = root_key if root_key.endswith(self.KEY_SEP) else root_key + self.KEY_SEP
+        with self._lock:
+            self._flush_locked()
+            cursor = self._conn.execute(
+                "DELETE FROM listings WHERE scan != ? AND (key = ? OR (key >= ? AND key < ?))",
+                (self._scan, root_key, prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+            )
+            self._conn.commit()
+        return cursor.rowcount
+    
+    def _flush_locked(self):
+        # Yalnızca yazılır; commit (ve diske eşitleme) kapanışta bir kez yapılır
+        if self._pending:
+            self._conn.executemany("INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)", self._pending)
+            self._pending = []
+        if self._touched:
+            self._conn.executemany("UPDATE listings SET scan = ? WHERE key = ?", self._touched)
+            self._touched = []
+    
+    def close(self):
+        """Bekleyen kayıtları yazar ve bağlantıyı kapatır."""
+        with self._lock:
+            self._stream = self._head = None
+            self._flush_locked()
+            self._conn.commit()
+            self._conn.close()
+
+
+class ScanPolicy:
+    """
+    Taramanın ne kadar derine ve genişe ineceğini belirleyen sınırlar.
+    
+    Bir sınıra takılan klasör açılmaz; satırında öğe sayısı, altında gösterilmeyen
+    öğeler için "... (N more items)" özeti yer alır. du modu sınırları uygulamaz.
+    """
+    
+    def __init__(self, max_depth=None,
+                max_entries_per_dir=None,
+                max_total_entries=None,
+                deadline=None,
+                collapse_preview=5):
+        """
+        Args:
+            max_depth (int): Bu derinlikteki klasörler açılmaz (0 = yalnızca kökün içeriği)
+            max_entries_per_dir (int): Klasör başına gösterilecek en fazla öğe
+            max_total_entries (int): Toplam gösterilecek öğe bütçesi
+            deadline (float): Saniye cinsinden süre sınırı; dolunca kalan klasörler özetlenir
+            collapse_preview (int): Daraltılan klasörlerde gösterilecek ilk öğe sayısı
+        """
+        self.max_depth = max_depth
+        self.max_entries_per_dir = max_entries_per_dir
+        self.max_total_entries = max_total_entries
+        self.deadline = deadline
+        self.collapse_preview = collapse_preview
+        self.collapse_rules = []
+        
+        # Tarama durumu
+        self.entries_emitted = 0
+        self.truncated = False
+        self._deadline_at = None
+    
+    def add_collapse_rule(self, predicate):
+        """
+        Daraltma kuralı ekler.
+        
+        Args:
+            predicate: predicate(name, rel_path, depth) -> bool; True dönen klasörler
+                       açılmadan ilk collapse_preview öğesiyle özetlenir
+        """
+        self.collapse_rules.append(predicate)
+        return self
+    
+    def copy(self):
+        """Aynı sınır ve kurallarla, tarama durumu sıfırlanmış yeni bir politika döndürür."""
+        policy = ScanPolicy(self.max_depth, self.max_entries_per_dir, self.max_total_entries,
+                            self.deadline, self.collapse_preview)
+        policy.collapse_rules = list(self.collapse_rules)
+        return policy
+    
+    def collapse_names(self, *names):
+        """Verilen isimdeki klasörleri daraltır (örn. 'node_modules', '.venv')."""
+        name_set = frozenset(names)
+        return self.add_collapse_rule(lambda name, rel_path, depth: name in name_set)
+    
+    def begin(self):
+        """Yeni tarama için sayaçları ve süre sınırını sıfırlar."""
+        self.entries_emitted = 0
+        self.truncated = False
+        self._deadline_at = time.monotonic() + self.deadline if self.deadline is not None else None
+    
+    def exhausted(self):
+        """Toplam bütçe veya süre dolduysa True döndürür."""
+        if self.max_total_entries is not None and self.entries_emitted >= self.max_total_entries:
+            return True
+        return self._deadline_at is not None and time.monotonic() >= self._deadline_at
+    
+    def expand_mode(self, name, rel_path, depth):
+        """Klasör için 'expand', 'collapse' (önizlemeli) veya 'limit' (yalnızca sayı) döndürür."""
+        for rule in self.collapse_rules:
+            if rule(name, rel_path, depth):
+                return 'collapse'
+        if self.max_depth is not None and depth >= self.max_depth:
+            return 'limit'
+        return 'expand'
+
+
+def _default_output_path(extension):
+    """Mevcut dizinde zaman damgalı varsayılan çıktı dosyası adı üretir."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"DirectoryExplorer_{timestamp}.{extension}"
+
+
+class OutputWriter:
+    """
+    Tarama kayıtlarını (ExplorerEntry veya DiskUsage) akış halinde yazan yazıcıların temel sınıfı.
+    
+    DirectoryExplorer.run() sırasıyla open(explorer), her kayıt için write(record)
+    ve en sonda close() çağırır. Kayıtlar bellekte biriktirilmez.
+    """
+    
+    extension = 'out'
+    
+    def __init__(self, output_path=None):
+        """
+        Args:
+            output_path (str): Çıktı dosyası yolu (boş ise DirectoryExplorer_<zaman>.<uzantı>)
+        """
+        self.output_path = output_path
+        self.explorer = None
+        self._file = None
+        self._error = None
+    
+    def open(self, explorer):
+        """Yazıcıyı tarama için hazırlar ve çıktı dosyasını açar."""
+        self.explorer = explorer
+        self.output_path = self.output_path or _default_output_path(self.extension)
+        self._error = None
+        try:
+            self._file = self._open_file(self.output_path)
+        except (OSError, IOError) as e:
+            self._file = None
+            self._error = e
+    
+    def _open_file(self, path):
+        return open(path, 'w', encoding='utf-8', newline='')
+    
+    def write(self, record):
+        """Tek bir kaydı yazar."""
+        raise NotImplementedError
+    
+    def close(self):
+        """Dosyayı kapatır ve sonucu bildirir."""
+        self._close_file()
+        if self._error is not None:
+            print(f"Dosya kaydedilirken hata: {self._error}")
+        else:
+            print(f"Çıktı kaydedildi: {os.path.abspath(self.output_path)}")
+    
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except (OSError, IOError) as e:
+                self._error = e
+            self._file = None
+    
+    def _fail(self, error):
+        """Yazma hatasında dosyayı bırakır; tarama diğer yazıcılarla sürer."""
+        self._error = error
+        self._close_file()
+
+
+class TextTreeWriter(OutputWriter):
+    """
+    Sabit genişlikli metin ağacı yazıcısı (varsayılan çıktı).
+    
+    Satırlar ekrana yazdırılır (echo) ve .txt dosyasına eklenir; çıktı biçimi
+    önceki DirectoryExplorer çıktısıyla aynıdır.
+    """
+    
+    extension = 'txt'
+    
+    def __init__(self, output_path=None, echo=True):
+        """
+        Args:
+            output_path (str): Metin dosyası yolu (boş ise DirectoryExplorer_<zaman>.txt)
+            echo (bool): Satırları ekrana da yazdır
+        """
+        super().__init__(output_path)
+        self.echo = echo
+        self._started = False
+    
+    def open(self, explorer):
+        super().open(explorer)
+        self._started = False
+        self._write_text(explorer._build_header())
+    
+    def _write_text(self, text):
+        if self.echo:
+            print(text)
+        if self._file is not None:
+            try:
+                # İlk metin başlıktır; sonraki her satır yeni satırla başlar
+                self._file.write('\n' + text if self._started else text)
+                self._started = True
+            except (OSError, IOError) as e:
+                self._fail(e)
+    
+    def write(self, record):
+        if isinstance(record, DiskUsage):
+            self._write_text(self.explorer._format_disk_usage_line(record))
+        else:
+            self._write_text(self.explorer._format_output_line(record))
+    
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.write("\n================================================================================\n")
+            except (OSError, IOError) as e:
+                self._fail(e)
+        self._close_file()
+        
+        if self._error is not None:
+            print(f"Dosya kaydedilirken hata: {self._error}")
+            return
+        
+        print(f"\n{'='*80}")
+        print(f"Çıktı kaydedildi: {os.path.abspath(self.output_path)}")
+        print(f"{'='*80}")
+
+
+class JsonLinesWriter(OutputWriter):
+    """Her kaydı bir JSON nesnesi olarak satır satır yazar (JSON Lines)."""
+    
+    extension = 'jsonl'
+    
+    def write(self, record):
+        if self._file is None:
+            return
+        try:
+            self._file.write(json.dumps(record._asdict(), ensure_ascii=False) + '\n')
+        except (OSError, IOError) as e:
+            self._fail(e)
+    
+    def _open_file(self, path):
+        return open(path, 'w', encoding='utf-8', errors='surrogateescape', newline='')
+
+
+class CsvWriter(OutputWriter):
+    """Kayıtları başlık satırlı CSV olarak yazar; boş alanlar boş hücredir."""
+    
+    extension = 'csv'
+    
+    def __init__(self, output_path=None):
+        super().__init__(output_path)
+        self._writer = None
+    
+    def _open_file(self, path):
+        return open(path, 'w', encoding='utf-8', errors='surrogateescape', newline='')
+    
+    def write(self, record):
+        if self._file is None:
+            return
+        try:
+            if self._writer is None:
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(record._fields)
+            self._writer.writerow(record)
+        except (OSError, IOError) as e:
+            self._fail(e)
+    
+    def close(self):
+        self._writer = None
+        super().close()
+
+
+class ColumnarWriter(OutputWriter):
+    """
+    Kayıtları sütunlu dosyaya yazar.
+    
+    pyarrow kuruluysa Parquet (batch_size kayıtlık satır grupları halinde);
+    değilse struct ile paketlenmiş ikili biçim kullanılır:
+        b'DEXBIN1\\n' + {"record": ..., "fields": [...]} JSON satırı, ardından her kayıt
+        için alan başına etiket + değer: N (None), ? (bool), q (int64), d (float64),
+        s (uint32 uzunluk + UTF-8). Okumak için ColumnarWriter.read_binary().
+    """
+    
+    BINARY_MAGIC = b'DEXBIN1\n'
+    
+    # Parquet şeması için alan tipleri (pyarrow fabrika fonksiyonu adları)
+    ARROW_TYPES = {
+        'kind': 'string', 'path': 'string', 'name': 'string', 'rel_path': 'string',
+        'message': 'string', 'depth': 'int32', 'is_dir': 'bool_', 'size': 'int64',
+        'allocated': 'int64', 'files': 'int64', 'count': 'int64', 'mtime': 'float64',
+    }
+    
+    _INT = struct.Struct('<q')
+    _FLOAT = struct.Struct('<d')
+    _LEN = struct.Struct('<I')
+    
+    def __init__(self, output_path=None, batch_size=65536, use_parquet=None):
+        """
+        Args:
+            output_path (str): Çıktı dosyası yolu (boş ise .parquet veya .bin)
+            batch_size (int): Parquet satır grubu başına kayıt sayısı
+            use_parquet (bool): None ise pyarrow varsa Parquet kullanılır
+        """
+        super().__init__(output_path)
+        self.batch_size = batch_size
+        self.use_parquet = PYARROW_AVAILABLE if use_parquet is None else (use_parquet and PYARROW_AVAILABLE)
+        self.extension = 'parquet' if self.use_parquet else 'bin'
+        self._columns = None
+        self._fields = None
+        self._parquet = None
+    
+    def _open_file(self, path):
+        if self.use_parquet:
+            return None  # ParquetWriter ilk kayıtta şema bilinince açılır
+        return open(path, 'wb')
+    
+    def write(self, record):
+        if self._error is not None:
+            return
+        try:
+            if self._fields is None:
+                self._start(record)
+            if self.use_parquet:
+                for column, value in zip(self._columns, record):
+                    column.append(value)
+                if len(self._columns[0]) >= self.batch_size:
+                    self._flush_batch()
+            else:
+                self._file.write(self._pack(record))
+        except (OSError, IOError) as e:
+            self._fail(e)
+    
+    def _start(self, record):
+        self._fields = record._fields
+        if self.use_parquet:
+            schema = pyarrow.schema([(field, getattr(pyarrow, self.ARROW_TYPES.get(field, 'string'))())
+                                     for field in self._fields])
+            self._parquet = pq.ParquetWriter(self.output_path, schema)
+            self._columns = [[] for _ in self._fields]
+        else:
+            header = {'record': type(record).__name__, 'fields': list(self._fields)}
+            self._file.write(self.BINARY_MAGIC + json.dumps(header).encode('utf-8') + b'\n')
+    
+    def _flush_batch(self):
+        if self._parquet is None or not self._columns[0]:
+            return
+        batch = pyarrow.Table.from_arrays(
+            [pyarrow.array(column, type=self._parquet.schema.field(i).type) for i, column in enumerate(self._columns)],
+            schema=self._parquet.schema
+        )
+        self._parquet.write_table(batch)
+        self._columns = [[] for _ in self._fields]
+    
+    def _pack(self, record):
+        parts = []
+        for value in record:
+            if value is None:
+                parts.append(b'N')
+            elif isinstance(value, bool):
+                parts.append(b'?\x01' if value else b'?\x00')
+            elif isinstance(value, int):
+                parts.append(b'q' + self._INT.pack(value))
+            elif isinstance(value, float):
+                parts.append(b'd' + self._FLOAT.pack(value))
+            else:
+                data = str(value).encode('utf-8', 'surrogateescape')
+                parts.append(b's' + self._LEN.pack(len(data)) + data)
+        return b''.join(parts)
+    
+    def close(self):
+        try:
+            if self.use_parquet:
+                self._flush_batch()
+                if self._parquet is not None:
+                    self._parquet.close()
+                    self._parquet = None
+        except (OSError, IOError) as e:
+            self._error = e
+        super().close()
+    
+    @classmethod
+    def read_binary(cls, path):
+        """İkili yedek biçimdeki dosyayı okur ve her kayıt için sözlük üretir."""
+        with open(path, 'rb') as f:
+            if f.read(len(cls.BINARY_MAGIC)) != cls.BINARY_MAGIC:
+                raise ValueError(f"DirectoryExplorer ikili dosyası değil: {path}")
+            fields = json.loads(f.readline().decode('utf-8'))['fields']
+            while True:
+                record = {}
+                for field in fields:
+                    tag = f.read(1)
+                    if not tag:
+                        return
+                    if tag == b'N':
+                        record[field] = None
+                    elif tag == b'?':
+                        record[field] = f.read(1) == b'\x01'
+                    elif tag == b'q':
+                        record[field] = cls._INT.unpack(f.read(8))[0]
+                    elif tag == b'd':
+                        record[field] = cls._FLOAT.unpack(f.read(8))[0]
+                    else:
+                        length = cls._LEN.unpack(f.read(4))[0]
+                        record[field] = f.read(length).decode('utf-8', 'surrogateescape')
+                yield record
 
 
 class DirectoryExplorer:
@@ -16,13 +745,25 @@ class DirectoryExplorer:
     Dizin yapısını analiz eden ve görselleştiren basit sınıf.
     """
     
+    # Paralel modda iş parçacığı başına en fazla bekleyen (önceden başlatılmış) listeleme
+    PREFETCH_PER_WORKER = 4
+    
     def __init__(self, root_path="", 
                 show_size=False, 
                 show_date=False, 
                 show_folder_count=False,
-                skip_hidden=True,
+                skip_hidden=None,
                 skip_patterns=None,
-                skip_site_packages_details=True):
+                skip_site_packages_details=True,
+                workers=1,
+                index_path=None,
+                index_trust_stats=False,
+                du_mode=False,
+                du_top_n=None,
+                one_file_system=False,
+                writers=None,
+                policy=None,
+                auto_run=True):
         """
         DirectoryExplorer sınıfını başlatır.
         
@@ -31,31 +772,138 @@ class DirectoryExplorer:
             show_size (bool): Dosya boyutlarını göster
             show_date (bool): Tarih bilgilerini göster
             show_folder_count (bool): Klasör içindeki öğe sayısını göster
-            skip_hidden (bool): Gizli dosya/klasörleri atla
-            skip_patterns (list): Atlanacak dosya/klasör desenleri
+            skip_hidden (bool): Gizli dosya/klasörleri atla. None ise ağaç modunda atlanır,
+                                du modunda sayılır (.git, .venv gibi gizli ağaçlar toplamlara girer).
+            skip_patterns (list): Atlanacak dosya/klasör desenleri (gitignore benzeri, bkz. SkipMatcher)
             skip_site_packages_details (bool): site-packages içeriğini basitleştir
+                                               (policy kopyasına daraltma kuralı olarak eklenir)
+            workers (int): Klasörleri paralel listeleyecek iş parçacığı sayısı
+                           (1 ise sıralı tarama). Çıktı sıralı tarama ile birebir aynıdır;
+                           en fazla workers * PREFETCH_PER_WORKER klasör önceden listelenir.
+            index_path (str): Kalıcı tarama indeksinin (sqlite) yolu. Verilirse mtime'ı
+                              değişmeyen klasörler yeniden listelenmez; yavaş veya ağ dosya
+                              sistemlerinde listeleme gidiş-dönüşlerini azaltır (bkz. ScanIndex).
+            index_trust_stats (bool): İndeks dosya boyut/tarihlerini de saklar; boyut veya tarih
+                                      gösterilirken değişmeyen klasörlerdeki dosyalar stat edilmez.
+                                      Yerinde değiştirilen dosyaların değerleri eski kalabilir.
+            du_mode (bool): Ağaç yerine klasör başına özyinelemeli boyut, ayrılan alan ve
+                            dosya sayısı (du benzeri) yazdırılır.
+            du_top_n (int): du modunda yalnızca en ağır N alt ağacı yazdır.
+            one_file_system (bool): du modunda başka dosya sistemlerine geçme.
+            writers (list): Çıktı yazıcıları (OutputWriter). Boş ise ekrana ve
+                            DirectoryExplorer_<zaman>.txt dosyasına metin ağacı yazılır.
+            policy (ScanPolicy): Derinlik, öğe, süre sınırları ve daraltma kuralları. Kopyalanarak
+                                 kullanılır; verilen nesne değişmez ve başka taramalarda tekrar kullanılabilir.
+            auto_run (bool): True ise tarama hemen çalıştırılıp yazdırılır ve kaydedilir;
+                             False ise iter_entries() veya run() ile başlatılır.
         """
         # Ayarlar
         self.root_path = root_path or os.getcwd()
         self.show_size = show_size
         self.show_date = show_date
         self.show_folder_count = show_folder_count
-        self.skip_hidden = skip_hidden
+        self.skip_hidden = (not du_mode) if skip_hidden is None else skip_hidden
         self.skip_patterns = skip_patterns or []
+        self._skip_matcher = SkipMatcher(self.skip_patterns)
         self.skip_site_packages_details = skip_site_packages_details
+        # Tarama sayaçları ve yerleşik kurallar çağıranın nesnesine yazılmaz
+        self.policy = policy.copy() if policy is not None else ScanPolicy()
+        if skip_site_packages_details:
+            self.policy.add_collapse_rule(lambda name, rel_path, depth: 'site-packages' in rel_path.lower())
+        self.workers = max(1, int(workers or 1))
+        self.index_path = index_path
+        self.index_trust_stats = index_trust_stats
+        self._index = None
+        self.du_mode = du_mode
+        self.du_top_n = du_top_n
+        self.one_file_system = one_file_system
         
         # Çıktı ayarları
         self.tab_size = 4
         self.output_width = 50
-        self.output_lines = []
+        self.writers = writers if writers is not None else [TextTreeWriter()]
+        
+        # Tarama istatistikleri (klasör listeleme, stat çağrısı ve girdi sayısı)
+        self.scan_stats = {'scandir': 0, 'stat': 0, 'entries': 0, 'index_hits': 0}
+        self._stats_lock = threading.Lock()
+        
+        # Paralel tarama durumu: tüketim (DFS) sırasındaki yaklaşan klasörler
+        # [yol, göreli yol, derinlik, açılacak mı, Future]; ilk birkaçının Future'ı başlatılmıştır
+        self._pool = None
+        self._upcoming = deque()
+        self._pending = {}
         
         # Başlat
-        self._print_header()
-        self._explore_directory()
-        self._save_output()
+        if auto_run:
+            self.run()
+    
+    def run(self):
+        """
+        Taramayı çalıştırır; kayıtları üretildikçe tüm yazıcılara aktarır.
+        
+        Kayıtlar bellekte biriktirilmez, bellek kullanımı ağaç boyutundan bağımsızdır.
+        """
+        for writer in self.writers:
+            writer.open(self)
+        try:
+            for record in self._iter_records():
+                for writer in self.writers:
+                    writer.write(record)
+        finally:
+            for writer in self.writers:
+                writer.close()
+        self._print_scan_stats()
     
-    def _print_header(self):
-        """Başlık bilgilerini yazdırır."""
+    def watch(self, callback=None, backend=None, poll_interval=1.0, stop_event=None):
+        """
+        Ağacı bellekte tutup değişiklikleri sürekli izler (bkz. DirectoryWatcher).
+        
+        Tam tarama yalnızca başlangıçta yapılır; sonrasında sadece değişen klasörler
+        yeniden listelenir.
+        """
+        watcher = DirectoryWatcher(self, backend=backend, poll_interval=poll_interval)
+        watcher.watch(callback, stop_event)
+        return watcher
+    
+    def _iter_records(self):
+        """Moda göre yazıcılara gidecek kayıtları üretir."""
+        if not self.du_mode:
+            return self.iter_entries()
+        usages = self.iter_disk_usage()
+        if self.du_top_n:
+            # Sabit boyutlu yığın: bellek kullanımı N ile sınırlı kalır
+            usages = heapq.nlargest(self.du_top_n, usages, key=lambda usage: usage.size)
+        return usages
+    
+    def iter_entries(self):
+        """
+        Dizin ağacını tembel olarak dolaşır ve her satır için bir ExplorerEntry üretir.
+        
+        Kayıtlar yazdırma sırasıyla üretilir (her seviyede önce klasörler, sonra dosyalar);
+        tüketici taramanın bitmesini beklemeden işlemeye başlayabilir.
+        """
+        with self._stats_lock:
+            for key in self.scan_stats:
+                self.scan_stats[key] = 0
+        
+        self.policy.begin()
+        if self.index_path:
+            self._index = ScanIndex(self.index_path, self.index_trust_stats and (self.show_size or self.show_date))
+        try:
+            if self.workers > 1:
+                yield from self._walk_parallel()
+            else:
+                yield from self._walk(self.root_path, 0, '')
+            # Yalnızca tamamlanan taramada görülmeyen klasörler silinmiş sayılabilir
+            if self._index is not None and not self.policy.truncated:
+                self._index.prune(self.root_path)
+        finally:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+    
+    def _build_header(self):
+        """Metin çıktısının başlık bilgilerini oluşturur."""
         header = f"""
 {'='*80}
     DIRECTORY EXPLORER / DİZİN KEŞİF ARACI
@@ -65,7 +913,13 @@ Tarih: {self._format_timestamp(datetime.datetime.now().timestamp())}
 {'='*80}"""
         
         # Sütun başlıkları
-        if self.show_folder_count or self.show_size or self.show_date:
+        if self.du_mode:
+            title = f"EN AĞIR {self.du_top_n} ALT AĞAÇ\n" if self.du_top_n else ""
+            if self.skip_hidden:
+                # Toplamlar eksik görünmesin diye dışarıda bırakılanlar belirtilir
+                title += "Gizli dosya/klasörler (.git, .venv vb.) toplamlara dahil değildir\n"
+            header += f"\n{title}{'SIZE':<12}{'ALLOCATED':<12}{'FILES':<12}{'PATH'}\n{'-'*80}"
+        elif self.show_folder_count or self.show_size or self.show_date:
             column_header = f"{'NAME':<60}"
             if self.show_folder_count:
                 column_header += f"{'COUNT':<12}"
@@ -76,26 +930,29 @@ Tarih: {self._format_timestamp(datetime.datetime.now().timestamp())}
             
             header += f"\n{column_header}\n{'-'*80}"
         
-        print(header)
-        self.output_lines.append(header)
+        return header
     
     def _format_timestamp(self, timestamp):
         """Unix timestamp'i okunabilir formata çevirir."""
         return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
     
-    def _should_skip(self, name, path, is_dir):
-        """Dosya/klasörün atlanıp atlanmayacağını kontrol eder."""
+    def _should_skip(self, name, rel_dir, is_dir):
+        """Dosya/klasörün atlanıp atlanmayacağını kontrol eder (rel_dir: üst klasörün göreli yolu)."""
         # Gizli dosyalar
         if self.skip_hidden and name.startswith('.'):
             return True
         
-        # Özel desenler
-        rel_path = os.path.relpath(path, self.root_path)
-        for pattern in self.skip_patterns:
-            if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern):
-                return True
-        
-        return False
+        # Özel desenler (derlenmiş)
+        matcher = self._skip_matcher
+        if not matcher:
+            return False
+        rel_path = self._join_rel(rel_dir, name) if matcher.needs_path else name
+        return matcher.match(name, rel_path, is_dir)
+    
+    @staticmethod
+    def _join_rel(rel_dir, name):
+        """Köke göreli klasör yoluna isim ekler; yol iniş sırasında taşınır, yeniden hesaplanmaz."""
+        return f"{rel_dir}/{name}" if rel_dir else name
     
     def _format_size(self, size_bytes):
         """Boyutu okunabilir formata çevirir."""
@@ -112,43 +969,357 @@ Tarih: {self._format_timestamp(datetime.datetime.now().timestamp())}
         
         return f"{size:.1f} {units[unit_index]}"
     
-    def _get_item_info(self, path):
-        """Dosya/klasör bilgilerini alır."""
+    def _get_item_info(self, entry, is_dir):
+        """
+        Dosya/klasör bilgilerini DirEntry üzerinden alır.
+        
+        Boyut ve tarih gösterilmiyorsa stat çağrısı hiç yapılmaz (size/mtime None);
+        gösteriliyorsa DirEntry'nin önbelleklenmiş stat verisi kullanılır.
+        """
+        if not (self.show_size or self.show_date):
+            return {'size': None, 'mtime': None, 'is_dir': is_dir}
         try:
-            stat = os.stat(path)
+            if getattr(entry, '_stat', None) is None:
+                self._add_stats(stat=1)
+            stat = entry.stat()
             return {
                 'size': stat.st_size,
-                'modified': self._format_timestamp(stat.st_mtime),
-                'is_dir': os.path.isdir(path)
+                'mtime': stat.st_mtime,
+                'is_dir': is_dir
             }
         except (OSError, IOError):
             return {
                 'size': 0,
-                'modified': 'N/A',
-                'is_dir': os.path.isdir(path)
+                'mtime': None,
+                'is_dir': is_dir
             }
     
-    def _count_items(self, dir_path):
-        """Klasördeki öğe sayısını hesaplar."""
+    def _entry_is_dir(self, entry):
+        """DirEntry'nin klasör olup olmadığını önbellekteki tür bilgisiyle belirler."""
+        # d_type sembolik bağlarda hedefi söylemez; is_dir() bu durumda stat yapar
+        if entry.is_symlink():
+            self._add_stats(stat=1)
+        return entry.is_dir()
+    
+    def _add_stats(self, **counts):
+        """Tarama sayaçlarını iş parçacığı güvenli şekilde artırır."""
+        with self._stats_lock:
+            for key, value in counts.items():
+                self.scan_stats[key] += value
+    
+    def _read_directory(self, dir_path):
+        """
+        Klasörün ham girdilerini [(entry, is_dir), ...] olarak okur.
+        
+        İndeks açıksa klasör önce stat edilir; mtime indeksteki kayıtla aynıysa
+        scandir yapılmadan önbellekteki liste döndürülür.
+        """
+        mtime_ns = None
+        if self._index is not None:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+            cached = self._index.lookup(dir_path, mtime_ns)
+            if cached is not None:
+                self._add_stats(stat=1, index_hits=1, entries=len(cached))
+                return cached
+            self._add_stats(stat=1)
+        
+        with os.scandir(dir_path) as it:
+            entries = [(entry, self._entry_is_dir(entry)) for entry in it]
+        self._add_stats(scandir=1, entries=len(entries))
+        
+        if self._index is not None:
+            self._index.store(dir_path, mtime_ns, entries)
+        return entries
+    
+    def _scan_directory(self, dir_path, rel_dir):
+        """
+        Klasörü tek bir listeleme ile okur ve atlama kurallarını uygular.
+        
+        Returns:
+            tuple: (ham girdiler, klasörler, dosyalar). Ham girdiler okuma sırasındaki
+                   (entry, is_dir) çiftleridir. Klasör ve dosya listeleri atlanmayan
+                   girdilerin isme göre sıralı (entry, info) çiftleridir; öğe sayısı
+                   len(klasörler) + len(dosyalar) olarak aynı listeden çıkar.
+        """
+        entries = self._read_directory(dir_path)
+        
+        dirs = []
+        files = []
+        for entry, is_dir in entries:
+            if self._should_skip(entry.name, rel_dir, is_dir):
+                continue
+            if is_dir:
+                dirs.append(entry)
+            else:
+                files.append(entry)
+        
+        dirs.sort(key=lambda e: e.name)
+        files.sort(key=lambda e: e.name)
+        # Bilgiler listeyi üreten iş parçacığında alınır; paralel modda stat da paralelleşir
+        dirs = [(entry, self._get_item_info(entry, True)) for entry in dirs]
+        files = [(entry, self._get_item_info(entry, False)) for entry in files]
+        return entries, dirs, files
+    
+    def _list_directory(self, dir_path, rel_dir):
+        """Klasör listesini döndürür; paralel modda önceden başlatılmış listelemeyi bekler."""
+        item = self._pending.get(dir_path)
+        if item is None:
+            return self._scan_directory(dir_path, rel_dir)
+        
+        # Bu klasörden önce sıradaki öğeler politika sınırları nedeniyle hiç istenmeyecek
+        while self._upcoming[0] is not item:
+            self._drop_upcoming(self._upcoming.popleft())
+        self._upcoming.popleft()
+        del self._pending[dir_path]
+        _, _, depth, expand, future = item
+        listing = future.result() if future is not None else self._scan_directory(dir_path, rel_dir)
+        
+        if expand and not self.policy.exhausted():
+            # Alt klasörler, DFS sırası korunarak sıranın başına eklenir
+            dirs = listing[1]
+            if self.policy.max_entries_per_dir is not None:
+                dirs = dirs[:self.policy.max_entries_per_dir]
+            children = []
+            for dir_entry, _ in dirs:
+                child_rel = self._join_rel(rel_dir, dir_entry.name)
+                child_expand = self.policy.expand_mode(dir_entry.name, child_rel, depth + 1) == 'expand'
+                child = [dir_entry.path, child_rel, depth + 1, child_expand, None]
+                self._pending[dir_entry.path] = child
+                children.append(child)
+            self._upcoming.extendleft(reversed(children))
+        self._fill_prefetch()
+        return listing
+    
+    def _drop_upcoming(self, item):
+        """Artık istenmeyecek öğeyi sıradan çıkarır; başlamamış listelemesi iptal edilir."""
+        self._pending.pop(item[0], None)
+        if item[4] is not None:
+            item[4].cancel()
+    
+    def _fill_prefetch(self):
+        """
+        Sıranın başındaki klasörlerin listelemesini havuza gönderir.
+        
+        Bekleyen listeleme sayısı workers * PREFETCH_PER_WORKER ile sınırlıdır; bellekte
+        tutulan liste sayısı ağaç boyutundan bağımsız kalır.
+        """
+        limit = self.workers * self.PREFETCH_PER_WORKER
+        for index, item in enumerate(self._upcoming):
+            if index >= limit:
+                break
+            if item[4] is None:
+                item[4] = self._pool.submit(self._scan_directory, item[0], item[1])
+    
+    def _walk_parallel(self):
+        """
+        Klasör listelemelerini iş parçacığı havuzunda yürütür.
+        
+        Kayıtlar ana iş parçacığında _walk ile sıralı üretildiği için çıktı sıralı
+        taramayla birebir aynıdır; yalnızca dosya sistemi beklemeleri örtüşür.
+        Havuz, ana iş parçacığının sıradaki ilk klasörlerini önceden listeler.
+        """
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="DirectoryExplorer")
+        self._pool = pool
+        try:
+            root = [self.root_path, '', -1, True, None]
+            self._pending[self.root_path] = root
+            self._upcoming.append(root)
+            self._fill_prefetch()
+            yield from self._walk(self.root_path, 0, '')
+        finally:
+            # Tüketici erken bırakırsa bekleyen listelemeler iptal edilir
+            pool.shutdown(wait=True, cancel_futures=True)
+            self._upcoming.clear()
+            self._pending.clear()
+            self._pool = None
+    
+    def _walk(self, current_path, depth, rel_dir, listing=None):
+        """
+        Dizini rekürsif olarak keşfeder ve kayıtları üretir.
+        
+        Her klasör yalnızca bir kez listelenir: alt klasörün listesi, kaydındaki
+        öğe sayısı için alınır ve aynı liste rekürsiyona aktarılır. ScanPolicy
+        sınırlarına takılan öğeler "more" kaydıyla sayı olarak özetlenir.
+        """
+        try:
+            if listing is None:
+                listing = self._list_directory(current_path, rel_dir)
+        except (OSError, IOError) as e:
+            yield ExplorerEntry('error', current_path, None, depth, False, None, None, None, str(e))
+            return
+        entries, dirs, files = listing
+        policy = self.policy
+        limit = policy.max_entries_per_dir
+        remaining = len(dirs) + len(files)
+        
+        # Önce klasörleri işle
+        for dir_entry, info in dirs:
+            if policy.exhausted() or (limit is not None and len(dirs) + len(files) - remaining >= limit):
+                policy.truncated = True
+                yield ExplorerEntry('more', current_path, None, depth, False, None, None, remaining, None)
+                return
+            remaining -= 1
+            dir_path = dir_entry.path
+            child_rel = self._join_rel(rel_dir, dir_entry.name)
+            try:
+                child_listing = self._list_directory(dir_path, child_rel)
+                child_error = None
+                item_count = len(child_listing[1]) + len(child_listing[2])
+            except (OSError, IOError) as e:
+                child_listing = None
+                child_error = e
+                item_count = 0
+            
+            yield ExplorerEntry('dir', dir_path, dir_entry.name, depth, True,
+                                info['size'], info['mtime'], item_count, None)
+            policy.entries_emitted += 1
+            
+            mode = policy.expand_mode(dir_entry.name, child_rel, depth)
+            if mode == 'collapse':
+                # Daraltılan klasör (örn. site-packages): ilk birkaç ham öğe ve kalan sayısı
+                if child_listing is None:
+                    continue
+                preview = policy.collapse_preview
+                sub_entries = child_listing[0]
+                for sub_entry, sub_is_dir in sub_entries[:preview]:
+                    sub_info = self._get_item_info(sub_entry, sub_is_dir)
+                    yield ExplorerEntry('dir' if sub_info['is_dir'] else 'file', sub_entry.path, sub_entry.name,
+                                        depth + 1, sub_info['is_dir'], sub_info['size'], sub_info['mtime'], None, None)
+                    policy.entries_emitted += 1
+                if len(sub_entries) > preview:
+                    yield ExplorerEntry('more', dir_path, None, depth + 1, False, None, None, len(sub_entries) - preview, None)
+            elif child_error is not None:
+                yield ExplorerEntry('error', dir_path, None, depth + 1, False, None, None, None, str(child_error))
+            elif mode == 'limit' or policy.exhausted():
+                # Derinlik/bütçe sınırı: klasör açılmaz, içeriği sayı olarak özetlenir
+                if item_count:
+                    policy.truncated = True
+                    yield ExplorerEntry('more', dir_path, None, depth + 1, False, None, None, item_count, None)
+            else:
+                # Normal rekürsif keşif
+                yield from self._walk(dir_path, depth + 1, child_rel, child_listing)
+        
+        # Sonra dosyaları işle
+        for file_entry, info in files:
+            if policy.exhausted() or (limit is not None and len(dirs) + len(files) - remaining >= limit):
+                policy.truncated = True
+                yield ExplorerEntry('more', current_path, None, depth, False, None, None, remaining, None)
+                return
+            remaining -= 1
+            yield ExplorerEntry('file', file_entry.path, file_entry.name, depth, False,
+                                info['size'], info['mtime'], None, None)
+            policy.entries_emitted += 1
+    
+    def iter_disk_usage(self):
+        """
+        Dizini tek geçişte dolaşır ve her klasör için özyinelemeli DiskUsage üretir.
+        
+        Kayıtlar du gibi alttan üste üretilir (alt klasörler üst klasörden önce).
+        Sembolik bağlar izlenmez, çoklu bağlantılı dosyalar (st_dev, st_ino) ile bir kez
+        sayılır; one_file_system açıksa başka cihazdaki klasörlere inilmez.
+        Atlama kuralları uygulanır, site-packages özetlemesi uygulanmaz; gizli öğeler
+        yalnızca skip_hidden açıkça verildiyse atlanır.
+        """
+        with self._stats_lock:
+            for key in self.scan_stats:
+                self.scan_stats[key] = 0
+        
         try:
-            items = os.listdir(dir_path)
-            return len([item for item in items if not self._should_skip(item, os.path.join(dir_path, item), os.path.isdir(os.path.join(dir_path, item)))])
+            root_stat = os.stat(self.root_path)
+            self._add_stats(stat=1)
         except (OSError, IOError):
-            return 0
+            return
+        seen_inodes = set()
+        yield from self._walk_disk_usage(self.root_path, '', 0, root_stat, root_stat.st_dev, seen_inodes)
     
-    def _format_output_line(self, name, depth, info, item_count=None):
-        """Çıktı satırını formatlar."""
+    @staticmethod
+    def _allocated_bytes(stat):
+        """Diskte ayrılan alanı döndürür (st_blocks yoksa görünen boyut)."""
+        blocks = getattr(stat, 'st_blocks', None)
+        return blocks * 512 if blocks is not None else stat.st_size
+    
+    def _walk_disk_usage(self, dir_path, rel_dir, depth, dir_stat, root_dev, seen_inodes):
+        """Klasörün alt ağaç toplamlarını hesaplar; son üretilen kayıt klasörün kendisidir."""
+        total_size = dir_stat.st_size
+        total_allocated = self._allocated_bytes(dir_stat)
+        total_files = 0
+        
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except (OSError, IOError):
+            entries = []
+        self._add_stats(scandir=1, entries=len(entries))
+        
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+            if self._should_skip(entry.name, rel_dir, is_dir):
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+                self._add_stats(stat=1)
+            except (OSError, IOError):
+                continue
+            
+            if is_dir:
+                if self.one_file_system and stat.st_dev != root_dev:
+                    continue
+                subdirs.append((entry, stat))
+                continue
+            
+            # Sert bağlantılar yalnızca ilk görüldüğü yerde sayılır
+            if stat.st_nlink > 1 and stat.st_ino:
+                key = (stat.st_dev, stat.st_ino)
+                if key in seen_inodes:
+                    continue
+                seen_inodes.add(key)
+            total_size += stat.st_size
+            total_allocated += self._allocated_bytes(stat)
+            total_files += 1
+        
+        subdirs.sort(key=lambda item: item[0].name)
+        for entry, stat in subdirs:
+            child = None
+            for usage in self._walk_disk_usage(entry.path, self._join_rel(rel_dir, entry.name),
+                                               depth + 1, stat, root_dev, seen_inodes):
+                yield usage
+                child = usage
+            total_size += child.size
+            total_allocated += child.allocated
+            total_files += child.files
+        
+        yield DiskUsage(dir_path, rel_dir, depth, total_size, total_allocated, total_files)
+    
+    def _format_disk_usage_line(self, usage):
+        """DiskUsage kaydını du satırına formatlar."""
+        size_str = self._format_size(usage.size)
+        allocated_str = self._format_size(usage.allocated)
+        path_str = usage.rel_path or '.'
+        return f"{size_str:<12}{allocated_str:<12}{usage.files:<12}{path_str}"
+    
+    def _format_output_line(self, entry):
+        """Kaydı çıktı satırına formatlar."""
+        # Özet ve hata satırları
+        if entry.kind == 'more':
+            return f"{'│' + ' ' * (self.tab_size - 1) * entry.depth}... ({entry.count} more items)"
+        if entry.kind == 'error':
+            return f"{'│' + ' ' * (self.tab_size - 1) * entry.depth}❌ Error accessing: {entry.message}"
+        
         # Indent
         indent = "│" + " " * (self.tab_size - 1)
-        prefix = indent * depth
+        prefix = indent * entry.depth
         
         # İsim
-        if info['is_dir']:
+        if entry.is_dir:
             icon = ">"
-            name_part = f"{icon} {name}/"
+            name_part = f"{icon} {entry.name}/"
         else:
             icon = "-"
-            name_part = f"{icon} {name}"
+            name_part = f"{icon} {entry.name}"
         
         # Sabit genişlikli sütunlar için hazırla
         full_name = prefix + name_part
@@ -164,14 +1335,14 @@ Tarih: {self._format_timestamp(datetime.datetime.now().timestamp())}
         size_str = ""
         date_str = ""
         
-        if self.show_folder_count and info['is_dir'] and item_count is not None:
-            count_str = f"({item_count})"
+        if self.show_folder_count and entry.is_dir and entry.count is not None:
+            count_str = f"({entry.count})"
         
-        if self.show_size and not info['is_dir']:
-            size_str = self._format_size(info['size'])
+        if self.show_size and not entry.is_dir:
+            size_str = self._format_size(entry.size or 0)
         
         if self.show_date:
-            date_str = info['modified']
+            date_str = self._format_timestamp(entry.mtime) if entry.mtime is not None else 'N/A'
         
         # Sütunları hizala
         formatted_line = f"{full_name:<{name_width}}"
@@ -187,100 +1358,430 @@ Tarih: {self._format_timestamp(datetime.datetime.now().timestamp())}
         
         return formatted_line.rstrip()
     
-    def _explore_directory(self, current_path=None, depth=0):
-        """Dizini rekürsif olarak keşfeder."""
-        if current_path is None:
-            current_path = self.root_path
+    def _print_scan_stats(self):
+        """Taramada yapılan dosya sistemi çağrılarının özetini yazdırır."""
+        stats = self.scan_stats
+        print(f"Tarama: {stats['entries']} girdi, {stats['scandir']} scandir, "
+              f"{stats['stat']} stat (toplam {stats['scandir'] + stats['stat']} çağrı), "
+              f"{stats['index_hits']} klasör indeksten"
+              + (" - tarama sınırlar nedeniyle kısaltıldı" if self.policy.truncated and not self.du_mode else ""))
+
+
+
+
+class _Inotify:
+    """ctypes üzerinden Linux inotify sarmalayıcısı (ek bağımlılık gerektirmez)."""
+    
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    
+    # Klasörün girdi listesini değiştiren olaylar; diğerleri yalnızca dosya içeriği/özniteliği
+    STRUCTURE_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+    CONTENT_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE
+    WATCH_MASK = STRUCTURE_MASK | CONTENT_MASK | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+    
+    _EVENT_HEADER = struct.Struct('iIII')
+    
+    def __init__(self):
+        self.fd = _libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+    
+    def add_watch(self, path):
+        """Klasörü izlemeye ekler ve izleme tanımlayıcısını (wd) döndürür."""
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+    
+    def rm_watch(self, wd):
+        _libc.inotify_rm_watch(self.fd, wd)
+    
+    def wait(self, timeout):
+        """Okunacak olay varsa True döndürür."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(readable)
+    
+    def read_events(self):
+        """Bekleyen olayları (wd, mask, isim) listesi olarak okur."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return events
+            offset = 0
+            header_size = self._EVENT_HEADER.size
+            while offset + header_size <= len(data):
+                wd, mask, _cookie, length = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += header_size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                events.append((wd, mask, name))
+    
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class DirectoryWatcher:
+    """
+    DirectoryExplorer ağacını bellekte tutan ve değişiklikleri artımlı izleyen izleyici.
+    
+    Linux'ta inotify kullanılır: yalnızca olay gelen klasörler yeniden listelenir,
+    içeriği değişen dosyalar tek tek stat edilir. inotify yoksa (veya izleme sınırı
+    dolarsa) izlenen klasörler belirli aralıklarla yoklanır. Atlama kuralları ve
+    ScanPolicy daraltma/derinlik kuralları ilk taramadaki gibi uygulanır.
+    
+    Değişiklikler WatchEvent listeleri olarak üretilir; klasör silinince önce alt
+    öğeleri, eklenince önce klasörün kendisi bildirilir.
+    """
+    
+    def __init__(self, explorer, backend=None, poll_interval=1.0, debounce=0.1):
+        """
+        Args:
+            explorer (DirectoryExplorer): Kök yol ve atlama kurallarının alınacağı gezgin
+            backend (str): 'inotify', 'poll' veya None (mümkünse inotify)
+            poll_interval (float): Yoklama aralığı (saniye)
+            debounce (float): Olay geldikten sonra toplu işlem öncesi bekleme (saniye)
+        """
+        if backend not in (None, 'inotify', 'poll'):
+            raise ValueError(f"Bilinmeyen izleme yöntemi: {backend}")
+        if backend == 'inotify' and not INOTIFY_AVAILABLE:
+            raise OSError("inotify bu sistemde kullanılamıyor")
+        self.explorer = explorer
+        self.root_path = explorer.root_path
+        self.backend = backend or ('inotify' if INOTIFY_AVAILABLE else 'poll')
+        self.poll_interval = poll_interval
+        self.debounce = debounce
         
-        try:
-            # Dizin içeriğini al
-            items = os.listdir(current_path)
-            
-            # Dosya ve klasörleri ayır
-            dirs = []
-            files = []
-            
-            for item in items:
-                item_path = os.path.join(current_path, item)
-                
-                if self._should_skip(item, item_path, os.path.isdir(item_path)):
+        # Bellekteki ağaç: göreli klasör -> {isim: (is_dir, size, mtime_ns, is_symlink)}
+        self.tree = {}
+        self._depths = {}
+        
+        self._inotify = None
+        self._wd_to_dir = {}
+        self._dir_to_wd = {}
+        self._started = False
+    
+    def start(self):
+        """İlk taramayı yapar ve izlemeleri kurar."""
+        if self._started:
+            return self
+        if self.backend == 'inotify':
+            self._inotify = _Inotify()
+        self._load_subtree('', 0, None)
+        self._started = True
+        return self
+    
+    def close(self):
+        """İzlemeleri bırakır."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self._wd_to_dir.clear()
+        self._dir_to_wd.clear()
+        self._started = False
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _abs_path(self, rel_path):
+        return os.path.join(self.root_path, *rel_path.split('/')) if rel_path else self.root_path
+    
+    def _scan_level(self, rel_dir):
+        """Klasörün doğrudan içeriğini atlama kurallarını uygulayarak okur."""
+        level = {}
+        explorer = self.explorer
+        with os.scandir(self._abs_path(rel_dir)) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                    if explorer._should_skip(entry.name, rel_dir, is_dir):
+                        continue
+                    if is_dir:
+                        # Klasör mtime'ı her girdi değişiminde değişir; klasörler yapısal olarak izlenir
+                        level[entry.name] = (True, None, None, entry.is_symlink())
+                    else:
+                        stat = entry.stat(follow_symlinks=False)
+                        level[entry.name] = (False, stat.st_size, stat.st_mtime_ns, False)
+                except (OSError, IOError):
                     continue
-                
-                if os.path.isdir(item_path):
-                    dirs.append(item)
-                else:
-                    files.append(item)
-            
-            # Sırala
-            dirs.sort()
-            files.sort()
-            
-            # Önce klasörleri işle
-            for dir_name in dirs:
-                dir_path = os.path.join(current_path, dir_name)
-                info = self._get_item_info(dir_path)
-                item_count = self._count_items(dir_path)
-                
-                line = self._format_output_line(dir_name, depth, info, item_count)
-                print(line)
-                self.output_lines.append(line)
-                
-                # site-packages özel durumu
-                rel_path = os.path.relpath(dir_path, self.root_path)
-                if self.skip_site_packages_details and 'site-packages' in rel_path.lower():
-                    # Sadece ilk seviye içeriği göster
-                    try:
-                        sub_items = os.listdir(dir_path)[:5]  # İlk 5 öğe
-                        for sub_item in sub_items:
-                            sub_path = os.path.join(dir_path, sub_item)
-                            sub_info = self._get_item_info(sub_path)
-                            sub_line = self._format_output_line(sub_item, depth + 1, sub_info)
-                            print(sub_line)
-                            self.output_lines.append(sub_line)
-                        if len(os.listdir(dir_path)) > 5:
-                            more_line = f"{'│' + ' ' * (self.tab_size - 1) * (depth + 1)}... ({len(os.listdir(dir_path)) - 5} more items)"
-                            print(more_line)
-                            self.output_lines.append(more_line)
-                    except (OSError, IOError):
-                        pass
-                else:
-                    # Normal rekürsif keşif
-                    self._explore_directory(dir_path, depth + 1)
-            
-            # Sonra dosyaları işle
-            for file_name in files:
-                file_path = os.path.join(current_path, file_name)
-                info = self._get_item_info(file_path)
-                
-                line = self._format_output_line(file_name, depth, info)
-                print(line)
-                self.output_lines.append(line)
-                
-        except (OSError, IOError) as e:
-            error_line = f"{'│' + ' ' * (self.tab_size - 1) * depth}❌ Error accessing: {e}"
-            print(error_line)
-            self.output_lines.append(error_line)
+        return level
+    
+    def _should_descend(self, name, rel_path, depth, info):
+        """Klasörün içeriğinin de izlenip izlenmeyeceğini belirler (sembolik bağlara inilmez)."""
+        return info[0] and not info[3] and self.explorer.policy.expand_mode(name, rel_path, depth) == 'expand'
     
-    def _save_output(self):
-        """Çıktıyı dosyaya kaydeder."""
+    def _add_watch(self, rel_dir):
+        if self._inotify is None:
+            return
         try:
-            # Dosya adı oluştur
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"DirectoryExplorer_{timestamp}.txt"
-            
-            # Dosyayı kaydet
-            with open(filename, 'w', encoding='utf-8') as f:
-                self.output_lines.append("================================================================================\n")
-                f.write('\n'.join(self.output_lines))
-
-            print(f"\n{'='*80}")
-            print(f"Çıktı kaydedildi: {os.path.join(os.getcwd(), filename)}")
-            print(f"{'='*80}")
-            
-        except (OSError, IOError) as e:
-            print(f"Dosya kaydedilirken hata: {e}")
-
-
+            wd = self._inotify.add_watch(self._abs_path(rel_dir))
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                # İzleme sınırı doldu (fs.inotify.max_user_watches): yoklamaya geç
+                print(f"inotify izleme sınırı doldu, yoklama moduna geçiliyor: {e}")
+                self._inotify.close()
+                self._inotify = None
+                self._wd_to_dir.clear()
+                self._dir_to_wd.clear()
+                self.backend = 'poll'
+            return
+        # Taşınan klasörün inode'u aynı kaldığı için çekirdek aynı wd'yi döndürür; eski yol bırakılır
+        previous = self._wd_to_dir.get(wd)
+        if previous is not None and previous != rel_dir and self._dir_to_wd.get(previous) == wd:
+            del self._dir_to_wd[previous]
+        self._wd_to_dir[wd] = rel_dir
+        self._dir_to_wd[rel_dir] = wd
+    
+    def _remove_watch(self, rel_dir):
+        wd = self._dir_to_wd.pop(rel_dir, None)
+        # wd başka bir yola (taşınan klasörün yeni yeri) aitse izleme kaldırılmaz
+        if wd is not None and self._wd_to_dir.get(wd) == rel_dir:
+            del self._wd_to_dir[wd]
+            if self._inotify is not None:
+                self._inotify.rm_watch(wd)
+    
+    def _event(self, kind, rel_path, info):
+        return WatchEvent(kind, self._abs_path(rel_path), rel_path, info[0], info[1], info[2])
+    
+    def _load_subtree(self, rel_dir, depth, events):
+        """
+        Klasörü ve izlenecek alt klasörlerini belleğe yükler.
+        
+        İzleme listelemeden önce kurulur; arada oluşan girdiler ya listede ya da
+        olay olarak görünür. events verilirse yüklenen her girdi için 'added' eklenir.
+        """
+        self._add_watch(rel_dir)
+        try:
+            level = self._scan_level(rel_dir)
+        except (OSError, IOError):
+            self._remove_watch(rel_dir)
+            return
+        self.tree[rel_dir] = level
+        self._depths[rel_dir] = depth
+        for name in sorted(level):
+            info = level[name]
+            child_rel = self.explorer._join_rel(rel_dir, name)
+            if events is not None:
+                events.append(self._event('added', child_rel, info))
+            if self._should_descend(name, child_rel, depth, info):
+                self._load_subtree(child_rel, depth + 1, events)
+    
+    def _drop_subtree(self, rel_dir, events):
+        """Klasörü ve altındaki her şeyi bellekten çıkarır; alt öğeler için 'removed' ekler."""
+        level = self.tree.pop(rel_dir, None)
+        self._depths.pop(rel_dir, None)
+        self._remove_watch(rel_dir)
+        if level is None:
+            return
+        for name in sorted(level):
+            info = level[name]
+            child_rel = self.explorer._join_rel(rel_dir, name)
+            if child_rel in self.tree:
+                self._drop_subtree(child_rel, events)
+            events.append(self._event('removed', child_rel, info))
+    
+    def _refresh_dir(self, rel_dir, events):
+        """Tek bir klasörü yeniden listeler ve bellekteki içeriğiyle farkını çıkarır."""
+        old = self.tree.get(rel_dir)
+        if old is None:
+            return
+        try:
+            new = self._scan_level(rel_dir)
+        except (OSError, IOError):
+            # Klasör silinmiş; üst klasörün olayı onu kaldırır (kök için burada kaldırılır)
+            if not rel_dir:
+                self._drop_subtree(rel_dir, events)
+            return
+        depth = self._depths[rel_dir]
+        self.tree[rel_dir] = new
+        
+        for name in sorted(old.keys() - new.keys()):
+            child_rel = self.explorer._join_rel(rel_dir, name)
+            self._drop_subtree(child_rel, events)
+            events.append(self._event('removed', child_rel, old[name]))
+        
+        for name in sorted(new):
+            info = new[name]
+            child_rel = self.explorer._join_rel(rel_dir, name)
+            previous = old.get(name)
+            if previous is not None and previous[0] == info[0] and previous[3] == info[3]:
+                if not info[0] and previous[1:3] != info[1:3]:
+                    events.append(self._event('modified', child_rel, info))
+                continue
+            if previous is not None:
+                # Tür değişti (dosya <-> klasör): kaldır + ekle
+                self._drop_subtree(child_rel, events)
+                events.append(self._event('removed', child_rel, previous))
+            events.append(self._event('added', child_rel, info))
+            if self._should_descend(name, child_rel, depth, info):
+                self._load_subtree(child_rel, depth + 1, events)
+    
+    def _refresh_file(self, rel_dir, name, events):
+        """İçeriği değişen tek bir dosyayı stat eder."""
+        level = self.tree.get(rel_dir)
+        if level is None or name not in level or level[name][0]:
+            return
+        try:
+            stat = os.stat(self._abs_path(self.explorer._join_rel(rel_dir, name)), follow_symlinks=False)
+        except (OSError, IOError):
+            # Silinmiş; IN_DELETE olayı klasörü yeniden listeler
+            return
+        info = (False, stat.st_size, stat.st_mtime_ns, False)
+        if level[name][1:3] != info[1:3]:
+            level[name] = info
+            events.append(self._event('modified', self.explorer._join_rel(rel_dir, name), info))
+    
+    def resync(self):
+        """İzlenen tüm klasörleri yeniden listeler (yoklama ve inotify taşması için)."""
+        events = []
+        for rel_dir in sorted(self.tree):
+            # Önceki adımda kaldırılan klasörler atlanır
+            if rel_dir in self.tree:
+                self._refresh_dir(rel_dir, events)
+        return events
+    
+    def poll(self, timeout=None):
+        """
+        Değişiklikleri bekler ve bellekteki ağacı günceller.
+        
+        Args:
+            timeout (float): En fazla bekleme süresi (None: ilk değişikliğe kadar)
+        
+        Returns:
+            list: WatchEvent listesi (süre dolduysa boş)
+        """
+        self.start()
+        if self._inotify is None:
+            interval = self.poll_interval if timeout is None else min(self.poll_interval, timeout)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                time.sleep(interval)
+                events = self.resync()
+                if events or (deadline is not None and time.monotonic() >= deadline):
+                    return events
+        
+        if not self._inotify.wait(timeout):
+            return []
+        # Kısa süre bekleyerek art arda gelen olayları tek seferde işle
+        if self.debounce:
+            time.sleep(self.debounce)
+        
+        dirty_dirs = set()
+        dirty_files = set()
+        overflow = False
+        for wd, mask, name in self._inotify.read_events():
+            if mask & _Inotify.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            rel_dir = self._wd_to_dir.get(wd)
+            if rel_dir is None:
+                continue
+            if mask & _Inotify.IN_IGNORED:
+                # Çekirdek izlemeyi kaldırdı (klasör silindi)
+                self._wd_to_dir.pop(wd, None)
+                if self._dir_to_wd.get(rel_dir) == wd:
+                    del self._dir_to_wd[rel_dir]
+            elif mask & _Inotify.STRUCTURE_MASK:
+                dirty_dirs.add(rel_dir)
+            elif mask & _Inotify.CONTENT_MASK and name:
+                dirty_files.add((rel_dir, name))
+        
+        if overflow:
+            return self.resync()
+        events = []
+        for rel_dir in sorted(dirty_dirs):
+            self._refresh_dir(rel_dir, events)
+        for rel_dir, name in sorted(dirty_files):
+            if rel_dir not in dirty_dirs:
+                self._refresh_file(rel_dir, name, events)
+        return events
+    
+    def iter_changes(self, stop_event=None):
+        """Her değişiklik grubunu WatchEvent listesi olarak üretir."""
+        self.start()
+        while stop_event is None or not stop_event.is_set():
+            # stop_event kontrol edilebilsin diye bekleme aralıklarla kesilir
+            events = self.poll(timeout=self.poll_interval)
+            if events:
+                yield events
+    
+    def watch(self, callback=None, stop_event=None):
+        """
+        Ctrl+C veya stop_event gelene kadar değişiklikleri izler.
+        
+        Args:
+            callback: callback(events) ile çağrılır; verilmezse değişiklikler yazdırılır
+            stop_event (threading.Event): Ayarlandığında izleme durur
+        """
+        callback = callback or self._print_events
+        with self:
+            print(f"İzleniyor ({self.backend}): {self.root_path} - {len(self.tree)} klasör")
+            try:
+                for events in self.iter_changes(stop_event):
+                    callback(events)
+            except KeyboardInterrupt:
+                pass
+    
+    def _print_events(self, events):
+        """Değişiklikleri '+', '-', '~' önekleriyle yazdırır."""
+        stamp = datetime.datetime.now().strftime('%H:%M:%S')
+        symbols = {'added': '+', 'removed': '-', 'modified': '~'}
+        for event in events:
+            suffix = '/' if event.is_dir else ''
+            size = f"  ({self.explorer._format_size(event.size)})" if event.size is not None and event.kind != 'removed' else ''
+            print(f"[{stamp}] {symbols[event.kind]} {event.rel_path}{suffix}{size}")
+    
+    @staticmethod
+    def test():
+        """Basit test fonksiyonu: klasörü başka bir üst klasöre taşıdıktan sonra izlemenin sürdüğünü doğrular."""
+        # a/ b/'den önce sıralanır: eklenen yol, kaldırılan yoldan önce işlenir
+        test_cases = [
+            {"name": "b/sub -> a/sub", "source": "b/sub", "target": "a/sub"},
+            {"name": "a/sub -> b/sub", "source": "a/sub", "target": "b/sub"},
+        ]
+        passed = 0
+        for i, t in enumerate(test_cases):
+            print(f"\n--- TEST {i+1}: {t['name']} ---")
+            root = tempfile.mkdtemp(prefix="DirectoryWatcher_test_")
+            try:
+                for rel in ("a", "b", t["source"]):
+                    os.makedirs(os.path.join(root, rel), exist_ok=True)
+                explorer = DirectoryExplorer(root_path=root, auto_run=False)
+                with DirectoryWatcher(explorer, debounce=0.05) as watcher:
+                    os.rename(os.path.join(root, t["source"]), os.path.join(root, t["target"]))
+                    watcher.poll(timeout=2)
+                    with open(os.path.join(root, t["target"], "new.txt"), "w", encoding="utf-8") as f:
+                        f.write("x")
+                    events = watcher.poll(timeout=2)
+                    expected = f"{t['target']}/new.txt"
+                    print(f"OLAYLAR ({watcher.backend}): {[(e.kind, e.rel_path) for e in events]}")
+                    if any(e.kind == "added" and e.rel_path == expected for e in events):
+                        print("BAŞARILI!"); passed += 1
+                    else:
+                        print("BAŞARISIZ!")
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+        print(f"\n{passed}/{len(test_cases)} test başarılı.")
 
 
 def main():
@@ -300,6 +1801,21 @@ def main():
         skip_patterns=['*.tmp', '*.log', '__pycache__', 'node_modules'],
         skip_site_packages_details=True
     )
+    
+    # Akış (generator) kullanımı - satırlar tarama sürerken işlenebilir:
+    # for entry in DirectoryExplorer(root_path=os.getcwd(), auto_run=False).iter_entries():
+    #     print(entry.path, entry.is_dir)
+    
+    # Sınırlı tarama: 3 seviye, klasör başına 200 öğe, 30 saniye; node_modules ve .venv daraltılır
+    # policy = ScanPolicy(max_depth=3, max_entries_per_dir=200, deadline=30).collapse_names('node_modules', '.venv')
+    # DirectoryExplorer(root_path=os.getcwd(), show_folder_count=True, policy=policy)
+    
+    # İzleme modu: ilk taramadan sonra yalnızca değişiklikler (+ eklendi, - silindi, ~ değişti)
+    # DirectoryExplorer(root_path=os.getcwd(), skip_patterns=['*.tmp'], auto_run=False).watch()
+    
+    # Makine tarafından okunabilir çıktı (metin biçimlendirmesi yapılmaz):
+    # DirectoryExplorer(root_path=os.getcwd(), show_size=True, show_date=True,
+    #                   writers=[JsonLinesWriter("tree.jsonl"), ColumnarWriter("tree.parquet")])
 
 
 if __name__ == "__main__":
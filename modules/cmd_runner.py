@@ -2,7 +2,7 @@
 # author    : mefamex
 # Created   : 2025-07-03-23:30
 # file_name : cmd_runner.py
-# version   : 0.5
+# version   : 0.12
 #
 
 """ updates :
@@ -21,27 +21,499 @@
                                 Boş çıktı testindeki sorun için mantık kontrol edildi.
 - 2025-07-06-18:10:00 -v0.5 : Workspace oluşturma kaldırıldı. Mevcut dizin kullanılacak.
                                 Log dosyaları "logs/cmd_runner_logs/" altında timestamp ile oluşturulacak.
+- 2026-10-18-10:00:00 -v0.6 : asyncio tabanlı execute_cmd_async ve sınırlı eşzamanlılıklı toplu çalıştırma
+                                (execute_batch_async / execute_batch) eklendi. Komut başına zaman aşımı
+                                desteklenir, sonuçlar execute_cmd ile aynı sözlük yapısındadır.
+- 2026-10-18-11:00:00 -v0.7 : Akışlı çıktı: satırlar geldikçe on_output geri çağrısına veya stream_cmd
+                                async iterator'ına iletilir. Saklanan çıktı max_output ile baş+son olarak
+                                sınırlanır, tam çıktı istenirse spill_path dosyasına yazılır.
+- 2026-10-18-12:00:00 -v0.8 : Oturum modu (session=True): Linux'ta her CodeExecutor için tek bir bash süreci
+                                açık tutulur. Komutlar boru üzerinden gönderilir (çok satırlı betikler için
+                                geçici dosya yazılmaz), bitiş işaretleriyle çıkış kodu ve çıktı ayrılır;
+                                cwd ve ortam değişkenleri çağrılar arasında korunur. Windows'ta eski davranış.
+- 2026-10-18-13:00:00 -v0.9 : Loglama arka plana alındı: QueueHandler/QueueListener ile dosyaya yazma komut
+                                süresine eklenmez. Log dosyası her komutta sıfırlanmıyor, boyuta göre döndürülüyor.
+                                Her komut için .jsonl dosyasına yapılandırılmış kayıt yazılıyor. Uzun çıktılar
+                                log_output_limit ile kısaltılıyor. basicConfig (kök logger) artık kullanılmıyor.
+- 2026-10-18-14:00:00 -v0.10: İsteğe bağlı sonuç önbelleği (cache_ttl): aynı komut, çalışma dizini ve seçili ortam
+                                değişkenleri için başarılı sonuç TTL süresince tekrar kullanılır, LRU ile sınırlanır.
+                                input_paths verilirse dosyaların mtime'ı değişince kayıt geçersiz olur.
+                                Sonuçta "cache": "hit" / "miss" bildirilir.
+- 2026-10-18-15:00:00 -v0.11: execution_time artık bitiş anı değil, gerçek çalışma süresi (saniye). POSIX'te alt süreç
+                                os.wait4 ile beklenir; sonuçta cpu_user / cpu_sys (saniye) ve max_rss_kb (süreç ağacının
+                                tepe belleği) raporlanır. Komut önekine göre süre histogramları: get_command_stats().
+- 2026-10-18-16:00:00 -v0.12: CommandScheduler: öncelikli iş kuyruğu, iş başına zaman aşımı ve son tarih, iptal
+                                tutamaçları (Job) ve işçi sınırı. Her komut kendi süreç grubunda çalışır; zaman aşımı
+                                ve iptal torunlar dahil tüm ağacı sonlandırır (POSIX: killpg, Windows: taskkill /T).
 
 """
-import subprocess, shutil, time, logging, os
+import subprocess, shutil, time, logging, os, sys, asyncio, uuid, signal, codecs, inspect, selectors, threading, json, queue, weakref
+import concurrent.futures, itertools
+import logging.handlers
+from collections import deque, OrderedDict
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union, Callable, Tuple
 
 FILE_ENCODING : str = 'utf-8'  # Windows konsol sınırlamaları nedeniyle 'cp65001' yerine 'utf-8' kullanıldı
+LOG_FORMAT    : str = '%(asctime)s - %(levelname)s - %(message)s'
+DURATION_BUCKETS : Tuple[float, ...] = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)  # Histogram üst sınırları (saniye)
+STREAM_CHUNK_SIZE : int = 65536  # Borulardan tek seferde okunan bayt; satırsız uzun çıktı da bu boyutta iletilir
+
+class OutputBuffer:
+    """Çıktının başını ve sonunu saklayan, toplam boyutu sınırlı tampon"""
+    
+    def __init__(self, max_chars: Optional[int] = None):
+        """
+        Args:
+            max_chars: Saklanacak en fazla karakter (yarısı baş, yarısı son; None ise sınırsız)
+        """
+        self.max_chars : Optional[int] = max_chars
+        self.total     : int = 0
+        self.head      : List[str] = []
+        self.head_len  : int = 0
+        self.tail      : deque = deque()
+        self.tail_len  : int = 0
+    
+    @property
+    def dropped(self) -> int:
+        """Saklanmayan (ortadan atılan) karakter sayısı"""
+        return self.total - self.head_len - self.tail_len
+    
+    def write(self, text: str) -> None:
+        self.total += len(text)
+        if self.max_chars is None:
+            self.head.append(text); self.head_len += len(text)
+            return
+        head_cap = self.max_chars // 2
+        tail_cap = self.max_chars - head_cap
+        if self.head_len < head_cap:
+            part = text[:head_cap - self.head_len]
+            self.head.append(part); self.head_len += len(part)
+            text = text[len(part):]
+        if not text or not tail_cap:
+            return
+        self.tail.append(text); self.tail_len += len(text)
+        # Son kısım halka tampon gibi davranır: sınırı aşan en eski parçalar atılır
+        while self.tail_len - len(self.tail[0]) >= tail_cap:
+            self.tail_len -= len(self.tail.popleft())
+        if self.tail_len > tail_cap:
+            cut = self.tail_len - tail_cap
+            self.tail[0] = self.tail[0][cut:]; self.tail_len -= cut
+    
+    def getvalue(self) -> str:
+        head = "".join(self.head)
+        tail = "".join(self.tail)
+        if not self.dropped:
+            return head + tail
+        return f"{head}\n... [{self.dropped} karakter atlandı] ...\n{tail}"
+
+
+class CommandStream:
+    """
+    stream_cmd tarafından döndürülen async iterator
+    
+    ("stdout" | "stderr", satır) çiftleri üretir; iterasyon bitince sonuç sözlüğü .result içindedir.
+    Döngüden erken çıkılırsa komut sonlandırılır.
+    """
+    
+    def __init__(self, executor: "CodeExecutor", command: str, **options: Any):
+        self.executor : "CodeExecutor" = executor
+        self.command  : str = command
+        self.options  : Dict[str, Any] = options
+        self.result   : Optional[Dict[str, Any]] = None
+    
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        # Sınırlı kuyruk: tüketici yavaşsa okuma durur, bellek büyümez
+        queue : asyncio.Queue = asyncio.Queue(maxsize=1024)
+        task = asyncio.ensure_future(self.executor.execute_cmd_async(
+            self.command, on_output=lambda name, line: queue.put((name, line)), **self.options))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                while not queue.empty():
+                    yield queue.get_nowait()
+                break
+            self.result = task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+                try: await task
+                except asyncio.CancelledError: pass
+
+class _CommandRecordFilter(logging.Filter):
+    """Komut kayıtlarını (extra={"command_record": ...}) metin loglarından ayırır"""
+    
+    def __init__(self, records: bool):
+        super().__init__()
+        self.records : bool = records
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        return hasattr(record, "command_record") == self.records
+
+
+class _JsonLinesFormatter(logging.Formatter):
+    """Komut kaydını tek satır JSON olarak biçimlendirir"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.command_record, ensure_ascii=False)
+
+
+def _kill_process_tree(pid: int) -> None:
+    """Süreci ve başlattığı tüm alt süreçleri sonlandırır (POSIX: süreç grubu, Windows: taskkill /T)"""
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], capture_output=True)
+        return
+    try: os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError: pass
+
+
+def _stop_listener(listener: logging.handlers.QueueListener) -> None:
+    """Kuyruktaki kayıtları yazar, log iş parçacığını durdurur ve dosyaları kapatır (CodeExecutor'a referans tutmaz)"""
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def _usage_fields(usage: Optional[Any]) -> Dict[str, Any]:
+    """wait4 rusage bilgisini sonuç alanlarına çevirir (yoksa None)"""
+    if usage is None:
+        return {"cpu_user": None, "cpu_sys": None, "max_rss_kb": None}
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir
+    max_rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return {"cpu_user": round(usage.ru_utime, 4), "cpu_sys": round(usage.ru_stime, 4), "max_rss_kb": max_rss}
+
+
+class CommandStats:
+    """Bir komut öneki için süre, CPU ve bellek toplamları ile süre histogramı (önbellek isabetleri ayrı sayılır)"""
+    
+    def __init__(self):
+        self.count      : int = 0
+        self.cache_hits : int = 0
+        self.failures   : int = 0
+        self.total_time : float = 0.0
+        self.max_time   : float = 0.0
+        self.total_cpu  : float = 0.0
+        self.max_rss_kb : int = 0
+        self.buckets    : List[int] = [0] * (len(DURATION_BUCKETS) + 1)
+    
+    def add(self, result: Dict[str, Any]) -> None:
+        if result.get("cache") == "hit":
+            self.cache_hits += 1
+            return
+        duration = result.get("execution_time") or 0.0
+        self.count += 1
+        self.failures += 0 if result.get("success") and result.get("exit_code") == 0 else 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.total_cpu += (result.get("cpu_user") or 0.0) + (result.get("cpu_sys") or 0.0)
+        self.max_rss_kb = max(self.max_rss_kb, result.get("max_rss_kb") or 0)
+        index = next((i for i, bound in enumerate(DURATION_BUCKETS) if duration <= bound), len(DURATION_BUCKETS))
+        self.buckets[index] += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}s" for bound in DURATION_BUCKETS] + [f">{DURATION_BUCKETS[-1]}s"]
+        return {
+            "count": self.count,
+            "cache_hits": self.cache_hits,
+            "failures": self.failures,
+            "total_time": round(self.total_time, 4),
+            "mean_time": round(self.total_time / self.count, 4) if self.count else 0.0,
+            "max_time": round(self.max_time, 4),
+            "total_cpu": round(self.total_cpu, 4),
+            "max_rss_kb": self.max_rss_kb,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class _AsyncChild:
+    """
+    Async çalıştırılan alt süreç
+    
+    POSIX'te süreç Popen ile kendi oturumunda başlatılır, borular olay döngüsüne bağlanır ve
+    çıkış os.wait4 ile alınır (pidfd varsa iş parçacığı kullanılmaz); böylece kaynak kullanımı
+    da okunur. Windows'ta asyncio alt süreci kullanılır, kaynak bilgisi yoktur.
+    """
+    
+    def __init__(self, process: Any, stdout: asyncio.StreamReader, stderr: asyncio.StreamReader):
+        self.process    : Any = process
+        self.pid        : int = process.pid
+        self.stdout     : asyncio.StreamReader = stdout
+        self.stderr     : asyncio.StreamReader = stderr
+        self.returncode : Optional[int] = None
+        self.usage      : Optional[Any] = None
+        self._exit_task : Optional[asyncio.Future] = None
+    
+    @classmethod
+    async def start(cls, command: str, cwd: str) -> "_AsyncChild":
+        if os.name == "nt":
+            process = await asyncio.create_subprocess_shell(
+                command, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+            return cls(process, process.stdout, process.stderr)
+        loop = asyncio.get_running_loop()
+        process = subprocess.Popen(command, shell=True, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   start_new_session=True)
+        streams = []
+        for pipe in (process.stdout, process.stderr):
+            reader = asyncio.StreamReader()
+            await loop.connect_read_pipe(lambda reader=reader: asyncio.StreamReaderProtocol(reader), pipe)
+            streams.append(reader)
+        return cls(process, *streams)
+    
+    async def wait(self) -> int:
+        if self.returncode is not None:
+            return self.returncode
+        if isinstance(self.process, asyncio.subprocess.Process):
+            self.returncode = await self.process.wait()
+            return self.returncode
+        if self._exit_task is None:
+            self._exit_task = asyncio.ensure_future(self._wait4())
+        await asyncio.shield(self._exit_task)
+        return self.returncode
+    
+    async def _wait4(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            pidfd = os.pidfd_open(self.pid)
+        except (AttributeError, OSError):
+            pidfd = None
+        if pidfd is None:
+            _, status, usage = await loop.run_in_executor(None, os.wait4, self.pid, 0)
+        else:
+            exited = loop.create_future()
+            loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+            try:
+                await exited
+            finally:
+                loop.remove_reader(pidfd)
+                os.close(pidfd)
+            _, status, usage = os.wait4(self.pid, 0)
+        self.returncode = self.process.returncode = os.waitstatus_to_exitcode(status)
+        self.usage = usage
+    
+    def kill(self) -> None:
+        """Kabuğu ve başlattığı tüm süreçleri (süreç grubu) sonlandırır"""
+        _kill_process_tree(self.pid)
+
+
+class ResultCache:
+    """
+    Komut sonuçları için TTL ve LRU sınırlı önbellek (iş parçacığı güvenli)
+    
+    Kayıtla birlikte bildirilen girdi dosyalarının mtime'ları saklanır; okumada biri
+    değişmişse kayıt geçersiz sayılır.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl         : float = ttl
+        self.max_entries : int = max_entries
+        self.hits        : int = 0
+        self.misses      : int = 0
+        self._entries    : "OrderedDict[Tuple, Tuple[float, Tuple, Dict[str, Any]]]" = OrderedDict()
+        self._lock       : threading.Lock = threading.Lock()
+    
+    @staticmethod
+    def input_signature(base_dir: str, input_paths: Optional[List[str]]) -> Tuple:
+        """Girdi yollarının (yol, mtime_ns) listesi; olmayan dosya için None"""
+        signature = []
+        for path in input_paths or ():
+            try: mtime = os.stat(Path(base_dir) / path).st_mtime_ns
+            except OSError: mtime = None
+            signature.append((str(path), mtime))
+        return tuple(signature)
+    
+    def get(self, key: Tuple, signature: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic() or entry[1] != signature:
+                if entry is not None: del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[2])
+    
+    def put(self, key: Tuple, signature: Tuple, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, signature, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _FrameReader:
+    """Oturum çıktısını bitiş işaretine kadar tampona aktaran okuyucu"""
+    
+    def __init__(self, marker: str, buffer: OutputBuffer):
+        self.marker  : str = marker
+        self.buffer  : OutputBuffer = buffer
+        self.pending : str = ""
+        self.trailer : Optional[str] = None
+        self.eof     : bool = False
+        self.decoder = codecs.getincrementaldecoder(FILE_ENCODING)(errors='replace')
+    
+    @property
+    def finished(self) -> bool:
+        return self.trailer is not None or self.eof
+    
+    def feed(self, data: bytes) -> None:
+        if not data:
+            self.eof = True
+            self.pending += self.decoder.decode(b"", final=True)
+            self.buffer.write(self.pending); self.pending = ""
+            return
+        self.pending += self.decoder.decode(data)
+        index = self.pending.find(self.marker)
+        if index < 0:
+            # İşaret iki okuma arasında bölünebilir; sonundaki kısım bekletilir
+            keep = len(self.marker) - 1
+            if len(self.pending) > keep:
+                self.buffer.write(self.pending[:-keep]); self.pending = self.pending[-keep:]
+            return
+        self.buffer.write(self.pending[:index]); self.pending = self.pending[index:]
+        end = self.pending.find("\n")
+        if end >= 0:
+            self.trailer = self.pending[len(self.marker):end]
+            self.pending = ""
+
+
+class ShellSession:
+    """
+    Komutları tek bir uzun ömürlü bash sürecinde çalıştıran oturum
+    
+    Her komut heredoc ile bir değişkene okunup eval edilir; ardından stdout'a çıkış kodlu,
+    stderr'e düz bitiş işareti yazılır. Komut mevcut kabukta çalıştığı için cd ve export
+    kalıcıdır. Zaman aşımında süreç grubu sonlandırılır, sonraki komut yeni oturum açar.
+    """
+    
+    def __init__(self, work_dir: str, shell: str = "bash"):
+        self.work_dir : str = work_dir
+        self.process  : subprocess.Popen = subprocess.Popen(
+            [shell, "--noprofile", "--norc"],
+            cwd=work_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            start_new_session=True
+        )
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.process.stdout, selectors.EVENT_READ, "stdout")
+        self.selector.register(self.process.stderr, selectors.EVENT_READ, "stderr")
+        self.lock     : threading.Lock = threading.Lock()
+    
+    def alive(self) -> bool:
+        return self.process.poll() is None
+    
+    def run(self, command: str, timeout: float, max_output: Optional[int] = None) -> Tuple[int, str, str]:
+        """
+        Komutu oturumda çalıştırır
+        
+        Returns:
+            Tuple: (çıkış kodu, stdout, stderr)
+        
+        Raises:
+            subprocess.TimeoutExpired: Süre dolduğunda (oturum kapatılır)
+        """
+        token = uuid.uuid4().hex
+        marker = f"__CMD_RUNNER_END_{token}__"
+        delimiter = f"__CMD_RUNNER_SCRIPT_{token}__"
+        # read ve eval kabuk yerleşikleridir: komut başına süreç başlatılmaz; stdin oturumun borusu
+        # olduğu için komutun stdin'i /dev/null'a bağlanır
+        script = (
+            f"IFS= read -r -d '' __cmd_runner_script <<'{delimiter}'\n{command}\n{delimiter}\n"
+            f"eval \"$__cmd_runner_script\" < /dev/null\n"
+            f"printf '%s%d\\n' '{marker}' \"$?\"\n"
+            f"printf '%s\\n' '{marker}' >&2\n"
+        )
+        readers = {
+            "stdout": _FrameReader(marker, OutputBuffer(max_output)),
+            "stderr": _FrameReader(marker, OutputBuffer(max_output)),
+        }
+        with self.lock:
+            self.process.stdin.write(script.encode(FILE_ENCODING))
+            deadline = time.monotonic() + timeout
+            while not all(reader.finished for reader in readers.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.close()
+                    raise subprocess.TimeoutExpired(command, timeout)
+                for key, _ in self.selector.select(remaining):
+                    reader = readers[key.data]
+                    if not reader.finished:
+                        reader.feed(os.read(key.fd, STREAM_CHUNK_SIZE))
+        
+        stdout, stderr = readers["stdout"], readers["stderr"]
+        if stdout.trailer is not None:
+            returncode = int(stdout.trailer)
+        else:
+            # Komut kabuğu sonlandırdı (örn. exit); çıkış kodu sürecinkidir
+            returncode = self.process.wait()
+            self.close()
+        return returncode, stdout.buffer.getvalue(), stderr.buffer.getvalue()
+    
+    def close(self) -> None:
+        """Oturumu ve başlattığı tüm süreçleri sonlandırır"""
+        if self.process.poll() is None:
+            _kill_process_tree(self.process.pid)
+        self.process.wait()
+        self.selector.close()
+        for pipe in (self.process.stdin, self.process.stdout, self.process.stderr):
+            try: pipe.close()
+            except OSError: pass
+
 
 class CodeExecutor:
-    def __init__(self, work_dir: str = "", timeout: int = 30):
+    def __init__(self, work_dir: str = "", timeout: int = 30, max_output: Optional[int] = None, session: bool = False,
+                 log_max_bytes: int = 10 * 1024 * 1024, log_backup_count: int = 5, log_output_limit: int = 4000,
+                 cache_ttl: Optional[float] = None, cache_size: int = 256, cache_env_keys: Tuple[str, ...] = ("PATH",)):
         """
         CMD kodlarını ve komutlarını güvenli şekilde çalıştıran executor
         
         Args:
             work_dir: Çalışma dizini (None ise mevcut dizin kullanılır)
             timeout: Maksimum çalışma süresi (saniye)
+            max_output: Akış başına saklanacak en fazla karakter (execute_cmd, async/akışlı çalıştırma ve oturum
+                        modu; None ise sınırsız). Aşılırsa baş ve son saklanır, sonuçta "output_truncated" bildirilir
+            session: execute_cmd komutlarını kalıcı bir bash oturumunda çalıştır (yalnızca bash olan
+                     POSIX sistemlerde; Windows'ta her komut ayrı süreçte çalışmaya devam eder)
+            log_max_bytes: Log dosyası bu boyuta ulaşınca döndürülür
+            log_backup_count: Saklanacak eski log dosyası sayısı
+            log_output_limit: Loglara yazılacak en fazla stdout/stderr karakteri (sonuç sözlüğü etkilenmez)
+            cache_ttl: Sonuç önbelleği süresi (saniye); None ise önbellek kapalı. Yalnızca yan etkisiz
+                       komutlarla kullanılmalı (git status, ls, python --version...)
+            cache_size: Önbellekte tutulacak en fazla sonuç (LRU)
+            cache_env_keys: Önbellek anahtarına eklenecek ortam değişkenleri
         """
         self.timeout      : int = timeout
+        self.max_output   : Optional[int] = max_output
+        self.session      : bool = session and os.name != "nt" and shutil.which("bash") is not None
+        self._shell       : Optional[ShellSession] = None
+        self.log_max_bytes    : int = log_max_bytes
+        self.log_backup_count : int = log_backup_count
+        self.log_output_limit : int = log_output_limit
+        self._log_finalizer   : Optional[weakref.finalize] = None
+        self.cache            : Optional[ResultCache] = ResultCache(cache_ttl, cache_size) if cache_ttl else None
+        self.cache_env_keys   : Tuple[str, ...] = tuple(cache_env_keys)
+        self.stats_prefix_words : int = 1
+        self._command_stats   : Dict[str, CommandStats] = {}
+        self._stats_lock      : threading.Lock = threading.Lock()
         self.work_dir     : str = work_dir or os.getcwd()
         self.log_filepath : Path
         self.log_filename : str
+        self.jsonl_filepath : Path
         self.log_dir      : Path
         self.cmd_runner_logs_dir : Path
         self.setup_logging()
@@ -61,41 +533,156 @@ class CodeExecutor:
         self.log_filename = f"cmd_runner_logs_{timestamp}.log"
         self.log_filepath = self.cmd_runner_logs_dir / self.log_filename
         
-        # Mevcut handler'ları temizle
-        logger = logging.getLogger(__name__)
-        for handler in list(logger.handlers):
-            logger.removeHandler(handler)
-            handler.close()
-
-        # Yeni logging yapılandırması
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_filepath, encoding=FILE_ENCODING),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+        self.jsonl_filepath = self.cmd_runner_logs_dir / f"cmd_runner_logs_{timestamp}.jsonl"
+        
+        # Her örneğin kendi logger'ı vardır; başka bir CodeExecutor'ın handler'larına dokunulmaz.
+        # logging.getLogger'a kaydedilmez: örnekle birlikte toplanır, loggerDict büyümez
+        logger = logging.Logger(f"{__name__}.{id(self)}")
+
+        # Dosya yazımı arka plan iş parçacığında yapılır; komutlar yalnızca kuyruğa ekler
+        text_filter, record_filter = _CommandRecordFilter(False), _CommandRecordFilter(True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.log_filepath, maxBytes=self.log_max_bytes, backupCount=self.log_backup_count, encoding=FILE_ENCODING)
+        stream_handler = logging.StreamHandler()
+        jsonl_handler = logging.handlers.RotatingFileHandler(
+            self.jsonl_filepath, maxBytes=self.log_max_bytes, backupCount=self.log_backup_count, encoding=FILE_ENCODING)
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            handler.addFilter(text_filter)
+        jsonl_handler.setFormatter(_JsonLinesFormatter())
+        jsonl_handler.addFilter(record_filter)
+        
+        self._stop_logging()
+        log_queue : queue.SimpleQueue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, jsonl_handler)
+        listener.start()
+        # Çıkışta veya örnek toplandığında durdurulur; atexit kaydının aksine örneği canlı tutmaz
+        self._log_finalizer = weakref.finalize(self, _stop_listener, listener)
+        
+        # Kök logger'a dokunulmaz; kayıtlar yalnızca bu örneğin logger'ından kuyruğa gider
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        self.logger = logger
         self.logger.info(f"CodeExecutor başlatıldı - Log dosyası: {self.log_filepath}")
     
-    def execute_cmd(self, command: str) -> Dict[str, Any]:
+    def _stop_logging(self) -> None:
+        """Kuyruktaki kayıtları yazar ve arka plan log iş parçacığını durdurur"""
+        finalizer, self._log_finalizer = self._log_finalizer, None
+        if finalizer is not None:
+            finalizer()
+    
+    def _clip_for_log(self, text: str) -> str:
+        """Loglanacak çıktıyı log_output_limit ile sınırlar"""
+        if len(text) <= self.log_output_limit:
+            return text
+        return f"{text[:self.log_output_limit]}... [{len(text) - self.log_output_limit} karakter daha]"
+    
+    def _log_command(self, result: Dict[str, Any], command: Optional[str]) -> None:
+        """Komut için yapılandırılmış JSONL kaydını kuyruğa ekler"""
+        stdout, stderr = result.get("stdout", ""), result.get("stderr", "")
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "command": command,
+            "cwd": self.work_dir,
+            "success": result["success"],
+            "exit_code": result["exit_code"],
+            "stdout": self._clip_for_log(stdout),
+            "stderr": self._clip_for_log(stderr),
+            "stdout_chars": len(stdout),
+            "stderr_chars": len(stderr),
+            "execution_time": result.get("execution_time"),
+            "cpu_user": result.get("cpu_user"),
+            "cpu_sys": result.get("cpu_sys"),
+            "max_rss_kb": result.get("max_rss_kb"),
+        }
+        for key in ("error", "output_truncated", "spill_path", "cache"):
+            if key in result: record[key] = result[key]
+        self.logger.info("command", extra={"command_record": record})
+    
+    def _record_stats(self, result: Dict[str, Any], command: Optional[str]) -> None:
+        """Sonucu komut önekinin (ilk kelime(ler)) istatistiklerine ekler"""
+        words = (command or "").split()
+        prefix = " ".join(words[:self.stats_prefix_words]) or "<boş>"
+        with self._stats_lock:
+            stats = self._command_stats.get(prefix)
+            if stats is None:
+                stats = self._command_stats[prefix] = CommandStats()
+            stats.add(result)
+    
+    def get_command_stats(self, sort_by: str = "total_time") -> Dict[str, Dict[str, Any]]:
+        """
+        Komut öneklerine göre toplanmış süre/CPU/bellek istatistikleri
+        
+        Args:
+            sort_by: Sıralama alanı (total_time, mean_time, max_time, total_cpu, count, max_rss_kb)
+        
+        Returns:
+            Dict: {önek: {"count", "total_time", "histogram", ...}} büyükten küçüğe sıralı;
+                  önbellek isabetleri süre/CPU toplamlarına girmez, "cache_hits" içinde sayılır
+        """
+        with self._stats_lock:
+            snapshot = {prefix: stats.to_dict() for prefix, stats in self._command_stats.items()}
+        return dict(sorted(snapshot.items(), key=lambda item: item[1][sort_by], reverse=True))
+    
+    def execute_cmd(self, command: str, use_cache: bool = True, input_paths: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         CMD komutunu çalıştır
         
         Args:
             command: Çalıştırılacak komut
+            use_cache: Önbellek açıksa bu komut için kullanılsın mı
+            input_paths: Komutun okuduğu dosyalar (çalışma dizinine göre); değişirlerse önbellek geçersiz
             
         Returns:
-            Dict: Çalıştırma sonuçları
+            Dict: Çalıştırma sonuçları (önbellek açıksa "cache": "hit" / "miss"; isabette
+                  execution_time arama süresidir, CPU/bellek alanları None)
         """
+        started = time.perf_counter()
+        key = self._cache_key(command) if use_cache else None
+        if key is None:
+            return self._execute_cmd(command)
+        signature = ResultCache.input_signature(self.work_dir, input_paths)
+        cached = self.cache.get(key, signature)
+        if cached is not None:
+            return self._cache_hit(key, cached, started)
+        result = self._execute_cmd(command)
+        return self._store_in_cache(key, signature, result)
+    
+    def _cache_key(self, command: str) -> Optional[Tuple]:
+        """Önbellek anahtarı; önbellek kapalıysa veya oturum modunda (cwd/ortam kabukta değişebilir) None"""
+        if self.cache is None or self.session:
+            return None
+        return (command.strip('\r\n'), self.work_dir, tuple((k, os.environ.get(k)) for k in self.cache_env_keys))
+    
+    def _cache_hit(self, key: Tuple, cached: Dict[str, Any], started: float) -> Dict[str, Any]:
+        """Önbellekten gelen sonuç; süre bu aramanın süresidir, ilk çalıştırmanın CPU/bellek değerleri taşınmaz"""
+        self.logger.info(f"COMMAND (önbellekten): {key[0]}")
+        cached.update(_usage_fields(None))
+        cached["execution_time"] = round(time.perf_counter() - started, 4)
+        cached["cache"] = "hit"
+        self._log_command(cached, key[0])
+        self._record_stats(cached, key[0])
+        return cached
+    
+    def _store_in_cache(self, key: Tuple, signature: Tuple, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Başarılı sonucu önbelleğe ekler ve "cache": "miss" ile döndürür"""
+        if result.get("success") and result.get("exit_code") == 0 and not result.get("output_truncated"):
+            self.cache.put(key, signature, result)
+        result["cache"] = "miss"
+        return result
+    
+    def _execute_cmd(self, command: str) -> Dict[str, Any]:
+        """execute_cmd'nin önbelleksiz gövdesi"""
+        started = time.perf_counter()
         try:
             while command.startswith('\n') or command.startswith('\r'):command = command[1:]
             while command.endswith('\n') or command.endswith('\r'):command = command[:-1]
-            with open(self.log_filepath, 'w', encoding=FILE_ENCODING) as f: f.write("#\n#\n#\n#\n#\n")
             self.logger.info(f"COMMAND: {command}")
             ## komuttaki metine kadar olan ilk satır atlamaların hepsini temizle
             
+            if self.session:
+                return self._execute_in_session(command, started)
+            
             newfile = False
             # if command more than 1 line write it to bat file and run there
             if "\n" in command:
@@ -106,73 +693,330 @@ class CodeExecutor:
                 command = f"call {bat_file_path} >> {txt_output_path} 2>&1"
                 newfile = True
 
-            result = subprocess.run(
-                command,
-                shell=True,
-                cwd=self.work_dir,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout,
-                encoding=FILE_ENCODING,
-                errors='replace' 
-            )
+            returncode, stdout_buffer, stderr_buffer, usage = self._run_process(command)
             if newfile:
+                stdout_buffer, stderr_buffer = OutputBuffer(self.max_output), OutputBuffer(self.max_output)
                 if txt_output_path.exists():
-                    file_output = txt_output_path.read_text(encoding=FILE_ENCODING)
-                    result.stdout = file_output
-                    result.stderr = ""
+                    stdout_buffer.write(txt_output_path.read_text(encoding=FILE_ENCODING))
                 else:
-                    result.stdout = ""
-                    result.stderr = "Çıktı dosyası bulunamadı."
-            stdout_output = result.stdout.strip()
-            stderr_output = result.stderr.strip()
-
-            # Boş çıktı durumunda özel mesaj
-            if not stdout_output and not stderr_output and result.returncode == 0:
-                stdout_output = "COMMAND EXECUTED BUT PRODUCED NO OUTPUT."
+                    stderr_buffer.write("Çıktı dosyası bulunamadı.")
+            extra : Dict[str, Any] = {}
+            if stdout_buffer.dropped or stderr_buffer.dropped: extra["output_truncated"] = True
+            return self._result(command, returncode, stdout_buffer.getvalue(), stderr_buffer.getvalue(),
+                                started, usage, **extra)
+        
+        except subprocess.TimeoutExpired:
+            return self._error_result(f"Komut {self.timeout} saniye içinde tamamlanamadı", "TimeoutExpired", command, started)
+        except Exception as e:
+            return self._error_result(f"Komut hatası: {str(e)}", str(e), command, started)
+    
+    def _run_process(self, command: str) -> Tuple[int, OutputBuffer, OutputBuffer, Optional[Any]]:
+        """
+        Komutu kabukta çalıştırır ve (çıkış kodu, stdout, stderr, rusage) döndürür
+        
+        Çıktılar max_output ile sınırlı OutputBuffer'lardadır; POSIX'te borular okunurken
+        sınırlanır, bellek kullanımı çıktı boyutuna bağlı değildir.
+        
+        POSIX'te süreç kendi oturumunda başlatılır ve os.wait4 ile beklenir: rusage, kabuk ve
+        beklediği tüm alt süreçlerin CPU süresi ile tepe belleğini içerir. Zaman aşımında tüm
+        süreç grubu sonlandırılır; kabuk çıksa da boruları açık tutan torunlar aynı süreye tabidir.
+        Windows'ta süreç yeni süreç grubunda başlatılır, zaman aşımında
+        ağaç taskkill /T ile sonlandırılır; rusage None'dır.
+        
+        Raises:
+            subprocess.TimeoutExpired: Süre dolduğunda
+        """
+        def newlines(text: str) -> str:
+            return text.replace('\r\n', '\n').replace('\r', '\n')
+        buffers = {"stdout": OutputBuffer(self.max_output), "stderr": OutputBuffer(self.max_output)}
+        
+        if os.name == "nt":
+            # subprocess.run zaman aşımında yalnızca kabuğu öldürür; torunlar için ağaç sonlandırılır
+            process = subprocess.Popen(command, shell=True, cwd=self.work_dir, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+            try:
+                stdout, stderr = process.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                _kill_process_tree(process.pid)
+                process.communicate()
+                raise
+            buffers["stdout"].write(newlines(stdout.decode(FILE_ENCODING, errors='replace')))
+            buffers["stderr"].write(newlines(stderr.decode(FILE_ENCODING, errors='replace')))
+            return process.returncode, buffers["stdout"], buffers["stderr"], None
+        
+        deadline = time.monotonic() + self.timeout
+        process = subprocess.Popen(command, shell=True, cwd=self.work_dir, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, start_new_session=True)
+        def read_pipe(pipe: Any, buffer: OutputBuffer) -> None:
+            decoder = codecs.getincrementaldecoder(FILE_ENCODING)(errors='replace')
+            carry = ""
+            with pipe:
+                for chunk in iter(lambda: pipe.read(STREAM_CHUNK_SIZE), b""):
+                    text = carry + decoder.decode(chunk)
+                    # Parçalar arasında bölünen \r\n tek satır sonu sayılsın diye sondaki \r bekletilir
+                    carry = "\r" if text.endswith("\r") else ""
+                    buffer.write(newlines(text[:len(text) - len(carry)]))
+                buffer.write(newlines(carry + decoder.decode(b"", final=True)))
+        readers = [threading.Thread(target=read_pipe, args=(process.stdout, buffers["stdout"]), daemon=True),
+                   threading.Thread(target=read_pipe, args=(process.stderr, buffers["stderr"]), daemon=True)]
+        for reader in readers: reader.start()
+        
+        timed_out = threading.Event()
+        def kill_group() -> None:
+            timed_out.set()
+            _kill_process_tree(process.pid)
+        timer = threading.Timer(self.timeout, kill_group)
+        timer.start()
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        finally:
+            timer.cancel()
+        # Popen'ın süreci tekrar beklememesi için çıkış kodu elle atanır
+        process.returncode = os.waitstatus_to_exitcode(status)
+        # Arka plandaki torunlar boruları açık tutabilir; okuma da kalan süreyle sınırlıdır
+        for reader in readers: reader.join(max(0.0, deadline - time.monotonic()))
+        if any(reader.is_alive() for reader in readers):
+            kill_group()
+            for reader in readers: reader.join(1.0)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(command, self.timeout)
+        return process.returncode, buffers["stdout"], buffers["stderr"], usage
+    
+    def _execute_in_session(self, command: str, started: float) -> Dict[str, Any]:
+        """Komutu kalıcı bash oturumunda çalıştır; oturum kapandıysa yenisi açılır (CPU/bellek bilgisi yok)"""
+        if self._shell is None or not self._shell.alive():
+            self._shell = ShellSession(self.work_dir)
+        returncode, stdout, stderr = self._shell.run(command, self.timeout, self.max_output)
+        return self._result(command, returncode, stdout, stderr, started)
+    
+    def _result(self, command: str, returncode: int, stdout: str, stderr: str,
+                started: Optional[float] = None, usage: Optional[Any] = None, **extra: Any) -> Dict[str, Any]:
+        """
+        Çıktıyı temizler, loglar ve execute_cmd ile aynı yapıda sonuç sözlüğü döndürür
+        
+        started: time.perf_counter() başlangıcı (execution_time süresi için); usage: wait4 rusage
+        """
+        stdout_output = stdout.strip()
+        stderr_output = stderr.strip()
+        
+        # Boş çıktı durumunda özel mesaj
+        if not stdout_output and not stderr_output and returncode == 0:
+            stdout_output = "COMMAND EXECUTED BUT PRODUCED NO OUTPUT."
+        
+        # Sonucu logla (uzun çıktılar kısaltılır)
+        if stdout_output: self.logger.info(f"STDOUT : {self._clip_for_log(stdout_output)}")
+        if stderr_output: self.logger.warning(f"STDERR : {self._clip_for_log(stderr_output)}")
+        
+        result = {
+            "success": True,
+            "exit_code": returncode,
+            "stdout": stdout_output,
+            "stderr": stderr_output,
+            "command": command,
+            "execution_time": round(time.perf_counter() - started, 4) if started is not None else None
+        }
+        result.update(_usage_fields(usage))
+        result.update(extra)
+        self._log_command(result, command)
+        self._record_stats(result, command)
+        return result
+    
+    def _error_result(self, error_msg: str, stderr: str, command: Optional[str] = None,
+                      started: Optional[float] = None) -> Dict[str, Any]:
+        """Hata durumunda execute_cmd ile aynı yapıda sonuç sözlüğü döndürür"""
+        self.logger.error(error_msg)
+        result = {
+            "success": False,
+            "error": error_msg,
+            "exit_code": -1,
+            "stdout": "",
+            "stderr": stderr,
+            "execution_time": round(time.perf_counter() - started, 4) if started is not None else None
+        }
+        self._log_command(result, command)
+        self._record_stats(result, command)
+        return result
+    
+    async def execute_cmd_async(self, command: str, timeout: Optional[float] = None,
+                                on_output: Optional[Callable[[str, str], Any]] = None,
+                                max_output: Optional[int] = None, spill_path: Optional[str] = None,
+                                use_cache: bool = True, input_paths: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        CMD komutunu asyncio alt süreci olarak çalıştır (olay döngüsünü bloklamaz)
+        
+        Args:
+            command: Çalıştırılacak komut
+            timeout: Bu komut için maksimum süre (None ise self.timeout)
+            on_output: Her satır için on_output(akış adı, satır) çağrılır (async de olabilir)
+            max_output: Akış başına saklanacak en fazla karakter (None ise self.max_output)
+            spill_path: Tam çıktının (stdout ve stderr geliş sırasıyla) yazılacağı dosya
+            use_cache, input_paths: execute_cmd ile aynı (akışlı çalıştırmada önbellek kullanılmaz)
+        
+        Returns:
+            Dict: execute_cmd ile aynı yapıda çalıştırma sonuçları; çıktı kısaltıldıysa
+                  "output_truncated", dosyaya yazıldıysa "spill_path" anahtarı eklenir
+        """
+        started = time.perf_counter()
+        key = self._cache_key(command) if use_cache and on_output is None and not spill_path else None
+        if key is None:
+            return await self._execute_cmd_async(command, timeout, on_output, max_output, spill_path)
+        signature = ResultCache.input_signature(self.work_dir, input_paths)
+        cached = self.cache.get(key, signature)
+        if cached is not None:
+            return self._cache_hit(key, cached, started)
+        result = await self._execute_cmd_async(command, timeout, on_output, max_output, spill_path)
+        return self._store_in_cache(key, signature, result)
+    
+    async def _execute_cmd_async(self, command: str, timeout: Optional[float],
+                                 on_output: Optional[Callable[[str, str], Any]],
+                                 max_output: Optional[int], spill_path: Optional[str]) -> Dict[str, Any]:
+        """execute_cmd_async'in önbelleksiz gövdesi"""
+        started = time.perf_counter()
+        timeout = self.timeout if timeout is None else timeout
+        max_output = self.max_output if max_output is None else max_output
+        bat_file_path = None
+        spill = None
+        try:
+            command = command.strip('\r\n')
+            self.logger.info(f"COMMAND: {command}")
+            
+            # Çok satırlı komutlar: bash satırları doğrudan işler, cmd.exe için eşzamanlı
+            # çalışmalar çakışmasın diye her komuta ayrı bat dosyası yazılır
+            shell_command = command
+            if "\n" in command and os.name == "nt":
+                bat_file_path = Path(self.work_dir) / f"tempCodeRunner_{uuid.uuid4().hex}.bat"
+                with open(bat_file_path, 'w', encoding=FILE_ENCODING) as f: f.write(f"{command}\n")
+                shell_command = f"call {bat_file_path} 2>&1"
             
-            # Sonucu logla
-            if stdout_output: self.logger.info(f"STDOUT : {stdout_output}")
-            if stderr_output: self.logger.warning(f"STDERR : {stderr_output}")
-
-            return {
-                "success": True,
-                "exit_code": result.returncode,
-                "stdout": stdout_output,
-                "stderr": stderr_output,
-                "command": command,
-                "execution_time": time.time()
-            }
+            if spill_path: spill = open(spill_path, 'w', encoding=FILE_ENCODING)
+            stdout_buffer = OutputBuffer(max_output)
+            stderr_buffer = OutputBuffer(max_output)
             
-        except subprocess.TimeoutExpired:
-            error_msg = f"Komut {self.timeout} saniye içinde tamamlanamadı"
-            self.logger.error(error_msg)
-            return {
-                "success": False,
-                "error": error_msg,
-                "exit_code": -1,
-                "stdout": "",
-                "stderr": "TimeoutExpired"
-            }
+            process = await _AsyncChild.start(shell_command, self.work_dir)
+            try:
+                await asyncio.wait_for(asyncio.gather(
+                    self._pump_stream(process.stdout, "stdout", stdout_buffer, on_output, spill),
+                    self._pump_stream(process.stderr, "stderr", stderr_buffer, on_output, spill),
+                    process.wait()
+                ), timeout)
+            except asyncio.TimeoutError:
+                await self._kill_process_async(process)
+                return self._error_result(f"Komut {timeout} saniye içinde tamamlanamadı", "TimeoutExpired", command, started)
+            except asyncio.CancelledError:
+                await self._kill_process_async(process)
+                raise
+            
+            extra : Dict[str, Any] = {}
+            if stdout_buffer.dropped or stderr_buffer.dropped: extra["output_truncated"] = True
+            if spill_path: extra["spill_path"] = str(spill_path)
+            return self._result(shell_command, process.returncode, stdout_buffer.getvalue(), stderr_buffer.getvalue(),
+                                started, process.usage, **extra)
         except Exception as e:
-            error_msg = f"Komut hatası: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                "success": False,
-                "error": error_msg,
-                "exit_code": -1,
-                "stdout": "",
-                "stderr": str(e)
-            }
+            return self._error_result(f"Komut hatası: {str(e)}", str(e), command, started)
+        finally:
+            if spill is not None: spill.close()
+            if bat_file_path is not None:
+                try: bat_file_path.unlink()
+                except OSError: pass
+    
+    async def _pump_stream(self, stream: asyncio.StreamReader, name: str, buffer: OutputBuffer,
+                           on_output: Optional[Callable[[str, str], Any]], spill: Any) -> None:
+        """Boruyu parça parça okur; tampona, dosyaya ve satır satır geri çağrıya aktarır"""
+        decoder = codecs.getincrementaldecoder(FILE_ENCODING)(errors='replace')
+        pending = ""
+        while True:
+            data = await stream.read(STREAM_CHUNK_SIZE)
+            text = decoder.decode(data, final=not data).replace('\r\n', '\n')
+            if text:
+                buffer.write(text)
+                if spill is not None: spill.write(text)
+                if on_output is not None:
+                    pending += text
+                    lines = pending.split('\n')
+                    pending = lines.pop()
+                    for line in lines: await self._emit_output(on_output, name, line)
+                    if len(pending) >= STREAM_CHUNK_SIZE:
+                        await self._emit_output(on_output, name, pending); pending = ""
+            if not data:
+                if pending and on_output is not None: await self._emit_output(on_output, name, pending)
+                return
+    
+    @staticmethod
+    async def _emit_output(on_output: Callable[[str, str], Any], name: str, line: str) -> None:
+        result = on_output(name, line)
+        if inspect.isawaitable(result): await result
+    
+    @staticmethod
+    async def _kill_process_async(process: _AsyncChild) -> None:
+        """Kabuğu ve başlattığı alt süreçleri sonlandırır (alt süreçler boruları açık tutabilir)"""
+        process.kill()
+        # wait() boruların da kapanmasını bekler: okunmamış çıktı okunup atılır
+        async def drain(stream: asyncio.StreamReader) -> None:
+            while await stream.read(STREAM_CHUNK_SIZE): pass
+        try: await asyncio.wait_for(asyncio.gather(drain(process.stdout), drain(process.stderr)), 5)
+        except asyncio.TimeoutError: pass
+        await process.wait()
+    
+    def execute_cmd_stream(self, command: str, on_output: Optional[Callable[[str, str], Any]] = None,
+                           timeout: Optional[float] = None, max_output: Optional[int] = None,
+                           spill_path: Optional[str] = None) -> Dict[str, Any]:
+        """execute_cmd_async için senkron sarmalayıcı; on_output satırlar geldikçe çağrılır"""
+        return asyncio.run(self.execute_cmd_async(command, timeout, on_output, max_output, spill_path))
+    
+    def stream_cmd(self, command: str, timeout: Optional[float] = None, max_output: Optional[int] = None,
+                   spill_path: Optional[str] = None) -> CommandStream:
+        """
+        Komut çıktısını async iterator olarak döndür
+        
+        Örnek:
+            stream = executor.stream_cmd("make")
+            async for name, line in stream: print(name, line)
+            result = stream.result
+        """
+        return CommandStream(self, command, timeout=timeout, max_output=max_output, spill_path=spill_path)
+    
+    async def execute_batch_async(self, commands: List[Union[str, Dict[str, Any]]], max_concurrency: Optional[int] = None,
+                                  timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Bağımsız komutları sınırlı eşzamanlılıkla çalıştır
+        
+        Args:
+            commands: Komut metinleri veya {"command": ..., "timeout": ..., "input_paths": [...]} sözlükleri
+            max_concurrency: Aynı anda çalışacak en fazla komut (None ise CPU sayısı)
+            timeout: Komut başına varsayılan süre (None ise self.timeout)
+        
+        Returns:
+            List[Dict]: Komutlarla aynı sırada sonuç sözlükleri
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+        
+        async def run_one(item: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+            if isinstance(item, dict):
+                command, item_timeout, input_paths = item["command"], item.get("timeout", timeout), item.get("input_paths")
+            else:
+                command, item_timeout, input_paths = item, timeout, None
+            async with semaphore:
+                return await self.execute_cmd_async(command, item_timeout, input_paths=input_paths)
+        
+        return list(await asyncio.gather(*(run_one(item) for item in commands)))
+    
+    def execute_batch(self, commands: List[Union[str, Dict[str, Any]]], max_concurrency: Optional[int] = None,
+                      timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """execute_batch_async için senkron sarmalayıcı (çalışan bir olay döngüsü içinden çağrılmamalı)"""
+        return asyncio.run(self.execute_batch_async(commands, max_concurrency, timeout))
     
     def cleanup(self) -> None:
-        """Logging handler'larını temizle"""
+        """Oturumu kapat ve logging handler'larını temizle"""
         try:
-            logger = logging.getLogger(__name__)
-            for handler in list(logger.handlers): 
-                handler.close()
-                logger.removeHandler(handler)
+            if self._shell is not None:
+                self._shell.close()
+                self._shell = None
             self.logger.info("CodeExecutor temizlendi")
+            for handler in list(self.logger.handlers): 
+                handler.close()
+                self.logger.removeHandler(handler)
+            # Kuyruktaki kayıtlar dosyaya yazılıp dosyalar kapatılır (Windows'ta dosya kilidi kalmaz)
+            self._stop_logging()
         except Exception as e:
             print(f"Temizleme hatası: {e}")
     
@@ -201,6 +1045,186 @@ class CodeExecutor:
                     print("BAŞARISIZ!")
         print(f"\n{passed}/{len(test_cases)} test başarılı.")
 
+class Job:
+    """
+    CommandScheduler'a gönderilen iş için tutamaç
+    
+    status: "queued", "running", "done" veya "cancelled". result() sonuç sözlüğünü bekler;
+    sonuç execute_cmd ile aynı yapıdadır, ek olarak "queue_time" (kuyrukta geçen saniye) içerir.
+    """
+    
+    def __init__(self, scheduler: "CommandScheduler", job_id: int, command: str, priority: int,
+                 timeout: Optional[float], deadline: Optional[float], input_paths: Optional[List[str]]):
+        self.id          : int = job_id
+        self.command     : str = command
+        self.priority    : int = priority
+        self.timeout     : Optional[float] = timeout
+        self.deadline    : Optional[float] = deadline
+        self.input_paths : Optional[List[str]] = input_paths
+        self.status      : str = "queued"
+        self.submitted   : float = time.perf_counter()
+        self.future      : concurrent.futures.Future = concurrent.futures.Future()
+        self._scheduler  : "CommandScheduler" = scheduler
+        self._task       : Optional[asyncio.Task] = None
+    
+    def cancel(self) -> bool:
+        """İşi iptal eder: kuyruktaysa hiç çalışmaz, çalışıyorsa süreç ağacı sonlandırılır"""
+        if self.future.done():
+            return False
+        self._scheduler._loop.call_soon_threadsafe(self._scheduler._cancel_job, self)
+        return True
+    
+    def done(self) -> bool:
+        return self.future.done()
+    
+    def result(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """İş bitene kadar bekler ve sonuç sözlüğünü döndürür"""
+        return self.future.result(timeout)
+    
+    def __repr__(self) -> str:
+        return f"<Job {self.id} {self.status} p={self.priority} {self.command!r}>"
+
+
+class CommandScheduler:
+    """
+    CodeExecutor üzerinde öncelikli iş kuyruğu
+    
+    İşler arka plandaki bir olay döngüsünde en fazla max_workers eşzamanlı çalıştırılır;
+    küçük öncelik değeri önce çalışır, eşit öncelikte gönderim sırası korunur. Her iş kendi
+    süreç grubunda çalışır: zaman aşımı, son tarih veya iptal tüm süreç ağacını sonlandırır
+    ve yer bir sonraki işe açılır.
+    """
+    
+    def __init__(self, executor: CodeExecutor, max_workers: int = 4):
+        """
+        Args:
+            executor: Komutları çalıştıracak CodeExecutor
+            max_workers: Aynı anda çalışacak en fazla iş
+        """
+        self.executor    : CodeExecutor = executor
+        self.max_workers : int = max_workers
+        self._counter    = itertools.count()
+        self._jobs       : Dict[int, Job] = {}
+        self._closed     : bool = False
+        self._loop       : asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._thread     : threading.Thread = threading.Thread(target=self._loop.run_forever, name="CommandScheduler", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_workers(), self._loop).result()
+    
+    async def _start_workers(self) -> None:
+        self._queue   : asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._workers : List[asyncio.Task] = [asyncio.ensure_future(self._worker()) for _ in range(self.max_workers)]
+    
+    def submit(self, command: str, priority: int = 0, timeout: Optional[float] = None,
+               deadline: Optional[float] = None, input_paths: Optional[List[str]] = None) -> Job:
+        """
+        Komutu kuyruğa ekle
+        
+        Args:
+            command: Çalıştırılacak komut
+            priority: Öncelik (küçük değer önce çalışır)
+            timeout: Çalışma süresi sınırı (None ise executor.timeout)
+            deadline: Gönderimden itibaren işin bitmesi gereken süre (saniye); kuyrukta
+                      geçen süre de sayılır, dolarsa iş başlatılmaz veya sonlandırılır
+            input_paths: Önbellek için komutun okuduğu dosyalar
+        
+        Returns:
+            Job: İptal ve sonuç bekleme tutamacı
+        """
+        if self._closed:
+            raise RuntimeError("CommandScheduler kapatıldı")
+        job_id = next(self._counter)
+        absolute_deadline = time.perf_counter() + deadline if deadline is not None else None
+        job = Job(self, job_id, command, priority, timeout, absolute_deadline, input_paths)
+        self._jobs[job_id] = job
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (priority, job_id, job))
+        return job
+    
+    def jobs(self, status: Optional[str] = None) -> List[Job]:
+        """Tamamlanmamış işleri (veya verilen durumdakileri) döndürür"""
+        return [job for job in list(self._jobs.values()) if status is None or job.status == status]
+    
+    def _finish(self, job: Job, result: Dict[str, Any], status: str = "done") -> None:
+        job.status = status
+        self._jobs.pop(job.id, None)
+        if not job.future.done():
+            job.future.set_result(result)
+    
+    def _cancel_job(self, job: Job) -> None:
+        """Olay döngüsünde çalışır: kuyruktaki işi işaretler, çalışanı durdurur"""
+        if job.future.done():
+            return
+        if job._task is not None:
+            job._task.cancel()
+        else:
+            self._finish(job, self.executor._error_result("İş iptal edildi", "Cancelled", job.command), "cancelled")
+    
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            if job is None:
+                return
+            if job.future.done():
+                continue
+            queue_time = round(time.perf_counter() - job.submitted, 4)
+            timeout = self.executor.timeout if job.timeout is None else job.timeout
+            if job.deadline is not None:
+                remaining = job.deadline - time.perf_counter()
+                if remaining <= 0:
+                    result = self.executor._error_result("Son tarih çalıştırılmadan doldu", "DeadlineExceeded", job.command)
+                    result["queue_time"] = queue_time
+                    self._finish(job, result)
+                    continue
+                timeout = min(timeout, remaining)
+            
+            job.status = "running"
+            job._task = asyncio.ensure_future(
+                self.executor.execute_cmd_async(job.command, timeout, input_paths=job.input_paths))
+            try:
+                result = await job._task
+                status = "done"
+            except asyncio.CancelledError:
+                # execute_cmd_async iptalde süreç grubunu sonlandırıp hatayı iletir
+                if not job._task.cancelled():
+                    raise
+                result = self.executor._error_result("İş iptal edildi", "Cancelled", job.command)
+                status = "cancelled"
+            except Exception as e:
+                result = self.executor._error_result(f"Komut hatası: {str(e)}", str(e), job.command)
+                status = "done"
+            result["queue_time"] = queue_time
+            self._finish(job, result, status)
+    
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """
+        Zamanlayıcıyı kapat
+        
+        Args:
+            wait: Kuyruktaki ve çalışan işlerin bitmesini bekle
+            cancel_pending: Bitmemiş tüm işleri iptal et
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if cancel_pending:
+            for job in self.jobs():
+                job.cancel()
+        # Bekçi değerler tüm işlerden sonra sıralanır; işçiler kuyruğu bitirince çıkar
+        for i in range(self.max_workers):
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (float("inf"), i, None))
+        if wait:
+            asyncio.run_coroutine_threadsafe(asyncio.wait(self._workers), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+    
+    def __enter__(self) -> "CommandScheduler":
+        return self
+    
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.shutdown(wait=True, cancel_pending=exc_type is not None)
+
+
 # Test
 def run_tests():
     """Test fonksiyonunu çalıştır"""
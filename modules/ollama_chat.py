@@ -2,10 +2,24 @@
 # author    : mefamex
 # Created   : 2025-07-06-19:04
 # file_name : ollama_chat.py
-# version   : v0.1
+# version   : v0.8
 #
 # updates :
 #   - 2025-07-06-19:04:00 -v0.1 : created -> Ollama_chat.py 
+#   - 2026-10-18-17:00:00 -v0.2 : pooled keep-alive session per instance, retry/backoff on connection errors,
+#                                 cached health state (refreshed on timer or after failures)
+#   - 2026-10-18-18:00:00 -v0.3 : stream_message() -> ChatStream: incremental NDJSON parsing, thinking/answer
+#                                 split, cancel(), TTFT / tokens-per-sec / duration stats
+#   - 2026-10-18-19:00:00 -v0.4 : send_batch(): thread-pool batch prompting bounded by the server's parallel slots,
+#                                 ordered results with per-item errors, latency / throughput stats
+#   - 2026-10-18-20:00:00 -v0.5 : opt-in ResponseCache (in-memory LRU + sqlite, TTL / size eviction) keyed by
+#                                 model, system prompt, message and options; hits flagged as "cached"
+#   - 2026-10-18-21:00:00 -v0.6 : Conversation: stateful multi-turn chat on /api/chat with a token budget inside
+#                                 num_ctx (sliding window with low-water trimming, optional summarization)
+#   - 2026-10-18-22:00:00 -v0.7 : readiness polling with exponential backoff and deadline instead of a fixed 5s sleep,
+#                                 optional model preload (warm_up / keep_alive), startup vs first-request timings
+#   - 2026-10-18-23:00:00 -v0.8 : HistoryWriter: buffered append-only JSONL history on a background thread with
+#                                 latency / token counts, size rotation, shared per path (replaces Temp_ollama_chat_history.txt)
 #
 
 """
@@ -14,89 +28,757 @@
 Bu modül, Ollama servisini başlatır ve mesajları gönderir.
 """
 
-import requests, subprocess 
+import requests, subprocess, time, json, threading, os, hashlib, sqlite3, re, queue, atexit, uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try: import fcntl         # Cross-process rotation lock (POSIX only)
+except ImportError: fcntl = None
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values: return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+
+class ResponseCache:
+    """
+    Two-level response cache: in-memory LRU in front of an optional sqlite file.
+    
+    Entries older than ttl seconds are ignored and removed; the memory level keeps max_entries,
+    the disk level max_disk_entries (least recently used are evicted first). Thread-safe.
+    """
+    def __init__(self, path=None, max_entries=256, max_disk_entries=10000, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()     # key -> (created, response)
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, created REAL, accessed REAL)")
+            self._db.commit()
+    
+    @staticmethod
+    def key(model, system_prompt, message, options) -> str:
+        raw = json.dumps({"model": model, "system": system_prompt, "message": message, "options": options}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _expired(self, created) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+    
+    def get(self, key):
+        """Cached response or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._memory[key]
+                entry = None
+            if entry is None and self._db is not None:
+                row = self._db.execute("SELECT created, response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row and self._expired(row[0]):
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                elif row:
+                    entry = row
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries: self._memory.popitem(last=False)
+    
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._remember(key, (now, response))
+            if self._db is None: return
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+            self._db.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_disk_entries,))
+            self._db.commit()
+    
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+    
+    def close(self):
+        with self._lock:
+            if self._db is not None: self._db.close()
+            self._db = None
+
+
+class HistoryWriter:
+    """
+    Append-only JSONL chat history written by a background thread.
+    
+    write() only queues the record; the thread batches queued records into one O_APPEND write, so
+    requests never wait on disk. When the file would exceed max_bytes it is rotated to .1 ... .backup_count.
+    Use HistoryWriter.shared(path) so every OllamaChat in the process writes through one writer;
+    separate processes append and rotate under a lock file (flock, POSIX).
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=3, flush_interval=0.5):
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.rotation_errors = 0
+        self._users = 0
+        self._queue = queue.Queue()
+        self._fd = self._open()
+        self._lock_file = open(self.path + ".lock", "a")
+        self._thread = threading.Thread(target=self._run, name="ollama-history", daemon=True)
+        self._thread.start()
+    
+    @classmethod
+    def shared(cls, path, **kwargs) -> "HistoryWriter":
+        """Process-wide writer for path (kwargs only apply when it is created); call release() when done"""
+        path = os.path.abspath(path)
+        with cls._shared_lock:
+            writer = cls._shared.get(path)
+            if writer is None or writer._fd is None: writer = cls._shared[path] = cls(path, **kwargs)
+            writer._users += 1
+            return writer
+    
+    def release(self):
+        with self._shared_lock:
+            self._users -= 1
+            if self._users > 0: return
+            if self._shared.get(self.path) is self: del self._shared[self.path]
+        self.close()
+    
+    def _open(self):
+        return os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    
+    def write(self, record):
+        """Queue one record (dict); never blocks on I/O"""
+        if self._fd is None: self.dropped += 1
+        else: self._queue.put(record)
+    
+    def flush(self):
+        """Block until every queued record is on disk"""
+        if self._thread.is_alive(): self._queue.join()
+    
+    def _run(self):
+        while True:
+            try: batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty: continue
+            while True:
+                try: batch.append(self._queue.get_nowait())
+                except queue.Empty: break
+            records = [r for r in batch if r is not None]
+            try:
+                lines = [(json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in records]
+                # One write per chunk that still fits in the current file
+                while lines:
+                    chunk, size = [], 0
+                    while lines and (not chunk or not self.max_bytes or size + len(lines[0]) <= self.max_bytes):
+                        size += len(lines[0])
+                        chunk.append(lines.pop(0))
+                    self._append(b"".join(chunk))
+            except OSError as e:
+                self.dropped += len(records)
+                print(f"⚠️  History write failed: {e}")
+            for _ in batch: self._queue.task_done()
+            if len(records) != len(batch): return
+    
+    def _append(self, data):
+        # Size check, rotation and write happen under the lock file, so processes sharing the path never overshoot
+        if fcntl: fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            # Another process may have rotated the file under us
+            try: rotated_elsewhere = os.stat(self.path).st_ino != os.fstat(self._fd).st_ino
+            except FileNotFoundError: rotated_elsewhere = True
+            if rotated_elsewhere: self._reopen()
+            size = os.fstat(self._fd).st_size
+            if self.max_bytes and size and size + len(data) > self.max_bytes: self._rotate()
+            os.write(self._fd, data)
+        finally:
+            if fcntl: fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+    
+    def _reopen(self):
+        os.close(self._fd)
+        self._fd = self._open()
+    
+    def _rotate(self):
+        # Windows cannot rename or delete a file that is still open, so close it first
+        os.close(self._fd)
+        try:
+            for i in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"): os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            if self.backup_count > 0: os.replace(self.path, f"{self.path}.1")
+            else: os.remove(self.path)
+        except OSError:
+            # Still held open elsewhere (another process on Windows): keep appending, retry on the next write
+            self.rotation_errors += 1
+        finally:
+            self._fd = self._open()
+    
+    def close(self):
+        if self._fd is None: return
+        self._queue.put(None)
+        self._thread.join()
+        os.close(self._fd)
+        self._lock_file.close()
+        self._fd = None
+    
+    @classmethod
+    def close_all(cls):
+        with cls._shared_lock:
+            writers = list(cls._shared.values())
+            cls._shared.clear()
+        for writer in writers: writer.close()
+
+
+atexit.register(HistoryWriter.close_all)
+
 
 class OllamaChat:
-    def __init__(self, model="deepseek-r1:14b", host="http://localhost:11434"):
+    def __init__(self, model="deepseek-r1:14b", host="http://localhost:11434", health_ttl=30.0, retries=3, backoff=0.5, pool_size=None, cache=None,
+                 ready_timeout=30.0, preload=False, keep_alive=None, history="Temp_ollama_chat_history.jsonl",
+                 history_max_bytes=10 * 1024 * 1024, history_backup_count=3):
+        """
+        cache: optional ResponseCache; identical model / system prompt / message / options are answered from it
+        ready_timeout: seconds to wait for a freshly started server
+        preload: load the model right after startup so the first message does not pay for it
+        keep_alive: how long Ollama keeps the model loaded after a request (e.g. "30m", -1 = forever)
+        history: JSONL history file shared by all instances (None disables it)
+        history_max_bytes / history_backup_count: rotation limits, used by the first instance that opens the file
+        """
         print("🔧 Initializing Ollama Chat...")
         self.model = model
         self.host = host
-        if self.start_ollama_service(): 
-            print("✅ Ollama service is running")
-            with open("Temp_ollama_chat_history.txt", "w") as f: f.write("Ollama Chat History:\n\n")
+        self.cache = cache
+        self.keep_alive = keep_alive
+        self.timings = {}       # startup / warm_up / first_request seconds
+        self.instance_id = uuid.uuid4().hex[:8]
+        self.history = HistoryWriter.shared(history, max_bytes=history_max_bytes,
+                                            backup_count=history_backup_count) if history else None
+        self.last_meta = {}     # {"cached": bool, "latency": seconds} of the last send_message
+        self.health_ttl = health_ttl      # Seconds a successful health check / request stays trusted
+        self._healthy_until = 0.0
+        # Match the server's parallel request slots so batch calls never wait on the connection pool
+        self.pool_size = pool_size or int(os.environ.get("OLLAMA_NUM_PARALLEL", 4))
+        self.session = self._create_session(retries, backoff, self.pool_size)
+        if self.start_ollama_service(ready_timeout): 
+            print(f"✅ Ollama service is running ({self.timings['startup']:.2f}s)")
+            if preload and self.warm_up(): print(f"🔥 Model {self.model} loaded ({self.timings['warm_up']:.2f}s)")
         else: print("❌ Failed to start Ollama service. Please ensure Ollama is installed and configured correctly.")
         
-    def is_ollama_running(self):
-        """Check if Ollama service is running"""
+    def _create_session(self, retries, backoff, pool_size) -> requests.Session:
+        """Keep-alive session; connection errors are retried with exponential backoff"""
+        # Only connection failures are retried for POST, a generation is never sent twice
+        retry = Retry(total=retries, connect=retries, read=0, status=retries, backoff_factor=backoff,
+                      status_forcelist=(502, 503, 504), allowed_methods=frozenset(["GET"]))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def _mark_healthy(self, healthy=True):
+        self._healthy_until = time.monotonic() + self.health_ttl if healthy else 0.0
+    
+    def is_ollama_running(self, force=False):
+        """Check if Ollama service is running (cached for health_ttl seconds unless force=True)"""
+        if not force and time.monotonic() < self._healthy_until: return True
         try:
-            response = requests.get(f"{self.host}/api/tags", timeout=5)
-            return response.status_code == 200
-        except: return False
-    
-    def start_ollama_service(self) -> bool:
-        """Start Ollama service if not running"""
-        if not self.is_ollama_running():
-            print("🚀 Starting Ollama service...")
-            try:
-                subprocess.Popen(["ollama", "serve"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                sleep(5)
-                return self.is_ollama_running()
-            except Exception as e: 
-                print(f"❌ Failed to start Ollama: {e}")
-                return False
-        return True
+            response = self.session.get(f"{self.host}/api/tags", timeout=5)
+            self._mark_healthy(response.status_code == 200)
+        except requests.RequestException: self._mark_healthy(False)
+        return self._healthy_until > 0
+    
+    def _probe(self, timeout=1.0) -> bool:
+        """Single health request without the session's retry backoff (startup polling)"""
+        try: healthy = requests.get(f"{self.host}/api/tags", timeout=timeout).status_code == 200
+        except requests.RequestException: healthy = False
+        self._mark_healthy(healthy)
+        return healthy
+    
+    def wait_until_ready(self, timeout=30.0, process=None, initial_delay=0.05, max_delay=0.5) -> bool:
+        """Poll the server with exponential backoff until it answers, the deadline passes or process exits"""
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        while True:
+            if self._probe(timeout=max(0.1, min(1.0, deadline - time.monotonic()))): return True
+            if process is not None and process.poll() is not None: return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: return False
+            sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+    
+    def warm_up(self, keep_alive=None) -> bool:
+        """Load the model into memory without generating (empty /api/generate request)"""
+        started = time.perf_counter()
+        payload = {"model": self.model}
+        keep_alive = keep_alive if keep_alive is not None else self.keep_alive
+        if keep_alive is not None: payload["keep_alive"] = keep_alive
+        try: ok = self._post("/api/generate", payload, first_request=False).status_code == 200
+        except requests.RequestException as e:
+            print(f"❌ Warm-up failed: {e}")
+            ok = False
+        self.timings["warm_up"] = round(time.perf_counter() - started, 4)
+        return ok
+    
+    def close(self):
+        """Close pooled connections (and the response cache / history writer)"""
+        self.session.close()
+        if self.cache is not None: self.cache.close()
+        if self.history is not None: self.history.release()
+        self.history = None
+    
+    def _record(self, kind, message, response, started, data=None, **extra):
+        """Queue one history record; token counts come from Ollama's response fields"""
+        if self.history is None: return
+        data = data or {}
+        self.history.write({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "instance": self.instance_id,
+            "pid": os.getpid(),
+            "kind": kind,
+            "model": self.model,
+            "message": message,
+            "response": response,
+            "latency": round(time.perf_counter() - started, 4),
+            "prompt_tokens": data.get("prompt_eval_count"),
+            "eval_tokens": data.get("eval_count"),
+            "total_duration": data.get("total_duration"),
+            **extra,
+        })
+    
+    def __enter__(self): return self
+    
+    def __exit__(self, *exc): self.close()
+    
+    def start_ollama_service(self, ready_timeout=30.0) -> bool:
+        """Start Ollama service if not running and wait until it answers (at most ready_timeout seconds)"""
+        started = time.perf_counter()
+        if time.monotonic() < self._healthy_until or self._probe():
+            self.timings.setdefault("startup", round(time.perf_counter() - started, 4))
+            return True
+        print("🚀 Starting Ollama service...")
+        try:
+            process = subprocess.Popen(["ollama", "serve"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            ready = self.wait_until_ready(ready_timeout, process)
+            self.timings["startup"] = round(time.perf_counter() - started, 4)
+            return ready
+        except Exception as e: 
+            print(f"❌ Failed to start Ollama: {e}")
+            return False
+    
+    def build_options(self) -> dict:
+        """Generation options, tuned for careful thinking on deepseek-r1"""
+        # Configure options for careful and thorough thinking
+        options = {
+            "temperature": 0.3,        # Lower temperature for more careful responses
+            "top_p": 0.7,             # More focused sampling
+            "top_k": 20,              # Reduced randomness
+            "max_tokens": 6000,       # More space for detailed thinking
+            "repeat_penalty": 1.2,    # Avoid repetition
+            "stop": [],
+            "num_ctx": 8192,          # Larger context window
+            "num_predict": 2048       # Allow longer predictions
+        }
+        
+        # Enable deep thinking for deepseek-r1
+        if "deepseek-r1" in self.model or "deepseek-r1:14b" in self.model:
+            options["thinking"] = True
+            options["max_tokens"] = 8000      # Even more tokens for deep thinking
+            options["temperature"] = 0.1      # Very careful and precise
+            options["top_p"] = 0.5           # Highly focused responses
+        return options
+    
+    def build_payload(self, message, system_prompt=None, stream=False) -> dict:
+        """/api/generate request body"""
+        full_prompt = ""
+        if system_prompt: full_prompt = f"System: {system_prompt}\n\nUser: {message}"
+        else: full_prompt = message
+        return {
+            "model": self.model,
+            "prompt": full_prompt,
+            "stream": stream,
+            "options": self.build_options(),
+            **({"keep_alive": self.keep_alive} if self.keep_alive is not None else {})
+        }
+    
+    def _post(self, path, payload, stream=False, first_request=True) -> requests.Response:
+        """POST on the pooled session, keeping the cached health state up to date"""
+        started = time.perf_counter()
+        try: response = self.session.post(f"{self.host}{path}", json=payload, stream=stream, timeout=(5, 180))  # Longer read timeout for careful thinking
+        except requests.ConnectionError:
+            self._mark_healthy(False)   # Next message re-checks the service
+            raise
+        self._mark_healthy()
+        # Includes the model load when the model was not preloaded
+        if first_request: self.timings.setdefault("first_request", round(time.perf_counter() - started, 4))
+        return response
+    
+    def _cache_key(self, message, system_prompt, payload):
+        if self.cache is None: return None
+        return self.cache.key(self.model, system_prompt, message, payload["options"])
+    
+    def stream_message(self, message, system_prompt=None) -> "ChatStream":
+        """
+        Stream a reply token by token.
+        
+        Iterating the returned ChatStream yields ("thinking" | "answer", text) pairs as chunks arrive.
+        Breaking out of the loop or calling cancel() (from any thread) stops the generation.
+        Timing stats are available on .stats once the stream ends (a cache hit is replayed, stats["cached"]).
+        """
+        payload = self.build_payload(message, system_prompt, stream=True)
+        return ChatStream(self, payload, message, self._cache_key(message, system_prompt, payload))
+    
+    def conversation(self, system_prompt=None, **kwargs) -> "Conversation":
+        """Start a multi-turn conversation on /api/chat (see Conversation for the token budget options)"""
+        return Conversation(self, system_prompt, **kwargs)
     
     def send_message(self, message, system_prompt=None) -> str:
         """Send message to Ollama with thinking enabled for deepseek-r1"""
+        started = time.perf_counter()
+        payload = self.build_payload(message, system_prompt)
+        cache_key = self._cache_key(message, system_prompt, payload)
+        cached = self.cache.get(cache_key) if cache_key else None
+        self.last_meta = {"cached": cached is not None, "latency": 0.0}
+        if cached is not None:
+            self.last_meta["latency"] = round(time.perf_counter() - started, 4)
+            self._record("generate", message, cached, started, cached=True)
+            return cached
+        
         if not self.is_ollama_running(): return print("❌ Ollama service is not running!") or ""
         
         try:
-            full_prompt = ""
-            if system_prompt: full_prompt = f"System: {system_prompt}\n\nUser: {message}"
-            else: full_prompt = message
-            
-            # Configure options for careful and thorough thinking
-            options = {
-                "temperature": 0.3,        # Lower temperature for more careful responses
-                "top_p": 0.7,             # More focused sampling
-                "top_k": 20,              # Reduced randomness
-                "max_tokens": 6000,       # More space for detailed thinking
-                "repeat_penalty": 1.2,    # Avoid repetition
-                "stop": [],
-                "num_ctx": 8192,          # Larger context window
-                "num_predict": 2048       # Allow longer predictions
-            }
-            
-            # Enable deep thinking for deepseek-r1
-            if "deepseek-r1" in self.model or "deepseek-r1:14b" in self.model:
-                options["thinking"] = True
-                options["max_tokens"] = 8000      # Even more tokens for deep thinking
-                options["temperature"] = 0.1      # Very careful and precise
-                options["top_p"] = 0.5           # Highly focused responses
-            
-            payload = {
-                "model": self.model,
-                "prompt": full_prompt,
-                "stream": False,
-                "options": options
-            }
-            
-            with open("Temp_ollama_chat_history.txt", "a") as f: f.write(f"\n\n\n\n\n===================================User: \n{message}\n")
-            
-            response = requests.post(f"{self.host}/api/generate", json=payload, timeout=180)  # Longer timeout for careful thinking
+            response = self._post("/api/generate", payload)
             
+            data = response.json() if response.status_code == 200 else {}
             def messageReturn():
-                if response.status_code == 200: return response.json().get("response", "").strip()
+                if response.status_code == 200: return data.get("response", "").strip()
                 else: return print(f"❌ API Error: {response.status_code}") or "" 
             
             returned = messageReturn()
-            with open("Temp_ollama_chat_history.txt", "a") as f: f.write(f"\n\n\n\n\n\n===================================Bot: \n{returned}\n")
+            self._record("generate", message, returned, started, data, status=response.status_code)
+            if cache_key and returned: self.cache.put(cache_key, returned)
+            self.last_meta["latency"] = round(time.perf_counter() - started, 4)
             return returned
                 
         except Exception as e:
             print(f"❌ Error: {e}")
+            self._record("generate", message, "", started, error=str(e))
             return ""
+    
+    def _batch_item(self, index, message, system_prompt) -> dict:
+        """One batch request; errors are returned in the result instead of raised"""
+        started = time.perf_counter()
+        result = {"index": index, "response": "", "error": None, "latency": 0.0, "tokens": None, "cached": False}
+        try:
+            payload = self.build_payload(message, system_prompt)
+            cache_key = self._cache_key(message, system_prompt, payload)
+            cached = self.cache.get(cache_key) if cache_key else None
+            if cached is not None: result.update(response=cached, cached=True)
+            else:
+                response = self._post("/api/generate", payload)
+                if response.status_code != 200: result["error"] = f"API Error: {response.status_code} {response.text[:200]}"
+                else:
+                    data = response.json()
+                    result["response"] = data.get("response", "").strip()
+                    result["tokens"] = data.get("eval_count")
+                    if cache_key and result["response"]: self.cache.put(cache_key, result["response"])
+        except Exception as e: result["error"] = str(e) or type(e).__name__
+        result["latency"] = round(time.perf_counter() - started, 4)
+        self._record("batch", message, result["response"], started, {"eval_count": result["tokens"]},
+                     cached=result["cached"], error=result["error"])
+        return result
+    
+    def send_batch(self, messages, system_prompt=None, max_workers=None):
+        """
+        Send independent prompts concurrently.
+        
+        At most max_workers requests are in flight (default: pool_size, i.e. the server's parallel slots).
+        Returns (results, stats): results follow the order of messages, each a dict with
+        index / response / error / latency / tokens; a failed item never stops the batch.
+        """
+        messages = list(messages)
+        workers = max(1, min(max_workers or self.pool_size, len(messages) or 1))
+        if workers > self.pool_size: print(f"⚠️  {workers} workers > pool_size {self.pool_size}, extra connections will not be reused")
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ollama-batch") as pool:
+            results = list(pool.map(lambda item: self._batch_item(item[0], item[1], system_prompt), enumerate(messages)))
+        wall = time.perf_counter() - started
+        
+        latencies = sorted(r["latency"] for r in results if r["error"] is None)
+        tokens = sum(r["tokens"] or 0 for r in results)
+        stats = {
+            "count": len(results),
+            "errors": sum(1 for r in results if r["error"] is not None),
+            "cached": sum(1 for r in results if r["cached"]),
+            "workers": workers,
+            "wall_time": round(wall, 4),
+            "requests_per_sec": round(len(results) / wall, 2) if wall else 0.0,
+            "tokens_per_sec": round(tokens / wall, 2) if wall else 0.0,
+            "latency_mean": round(sum(latencies) / len(latencies), 4) if latencies else None,
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+            "latency_max": latencies[-1] if latencies else None,
+        }
+        return results, stats
+
+
+class ChatStream:
+    """Iterator over a streaming /api/generate call"""
+    THINK_OPEN, THINK_CLOSE = "<think>", "</think>"
+    
+    def __init__(self, chat, payload, message, cache_key=None):
+        self.chat = chat
+        self.payload = payload
+        self.message = message
+        self.cache_key = cache_key
+        self.thinking = ""
+        self.answer = ""
+        self.stats = {}
+        self._response = None
+        self._cancelled = threading.Event()
+        self._iterated = False
+    
+    def cancel(self):
+        """Stop the stream; closing the connection makes Ollama abort the generation"""
+        self._cancelled.set()
+        if self._response is not None: self._response.close()
+    
+    def __iter__(self):
+        if self._iterated: raise RuntimeError("ChatStream can only be iterated once")
+        self._iterated = True
+        return self._stream()
+    
+    def text(self) -> str:
+        """Consume the stream and return the answer"""
+        for _ in self: pass
+        return self.answer.strip()
+    
+    def _stream(self):
+        started = time.perf_counter()
+        first_token = None
+        chunks = 0
+        final = {}
+        in_think = False
+        pending = ""       # Text held back while it could still be the start of a <think> tag
+        
+        cached = self.chat.cache.get(self.cache_key) if self.cache_key else None
+        try:
+            if cached is not None: lines = [json.dumps({"response": cached, "done": True})]   # Replay through the same parser
+            else:
+                self._response = self.chat._post("/api/generate", self.payload, stream=True)
+                if self._response.status_code != 200:
+                    print(f"❌ API Error: {self._response.status_code}")
+                    return
+                lines = self._response.iter_lines()
+            for line in lines:
+                if self._cancelled.is_set(): break
+                if not line: continue
+                data = json.loads(line)
+                if data.get("error"):
+                    print(f"❌ API Error: {data['error']}")
+                    break
+                if first_token is None and (data.get("response") or data.get("thinking")): first_token = time.perf_counter()
+                chunks += 1
+                
+                # Newer Ollama versions send thinking in its own field
+                if data.get("thinking"):
+                    self.thinking += data["thinking"]
+                    yield "thinking", data["thinking"]
+                
+                pending += data.get("response", "")
+                while pending:
+                    tag = self.THINK_CLOSE if in_think else self.THINK_OPEN
+                    index = pending.find(tag)
+                    if index >= 0: text, pending, switch = pending[:index], pending[index + len(tag):], True
+                    else:
+                        # Keep a possible partial tag at the end for the next chunk
+                        keep = next((n for n in range(len(tag) - 1, 0, -1) if pending.endswith(tag[:n])), 0)
+                        text, pending, switch = pending[:len(pending) - keep], pending[len(pending) - keep:], False
+                    if text:
+                        kind = "thinking" if in_think else "answer"
+                        if kind == "thinking": self.thinking += text
+                        else: self.answer += text
+                        yield kind, text
+                    if switch: in_think = not in_think
+                    elif not text: break
+                
+                if data.get("done"):
+                    final = data
+                    break
+            if pending and not self._cancelled.is_set():
+                kind = "thinking" if in_think else "answer"
+                if kind == "thinking": self.thinking += pending
+                else: self.answer += pending
+                yield kind, pending
+        except Exception as e:
+            # Closing the response from another thread surfaces as a read error
+            if not self._cancelled.is_set(): print(f"❌ Error: {e}")
+        finally:
+            cancelled = self._cancelled.is_set() or not final
+            if self._response is not None: self._response.close()
+            self._finish(started, first_token, chunks, final, cancelled, cached is not None)
+            self.chat._record("stream", self.message, self.answer.strip(), started, final, thinking=self.thinking.strip(), **self.stats)
+    
+    def _finish(self, started, first_token, chunks, final, cancelled, cached):
+        ended = time.perf_counter()
+        tokens = final.get("eval_count", chunks)
+        if final.get("eval_duration"): tokens_per_sec = tokens / (final["eval_duration"] / 1e9)
+        elif first_token and ended > first_token: tokens_per_sec = tokens / (ended - first_token)
+        else: tokens_per_sec = 0.0
+        self.stats = {
+            "ttft": round(first_token - started, 4) if first_token else None,
+            "duration": round(ended - started, 4),
+            "tokens": tokens,
+            "tokens_per_sec": round(tokens_per_sec, 2),
+            "prompt_tokens": final.get("prompt_eval_count"),
+            "cancelled": cancelled,
+            "cached": cached,
+        }
+        if self.cache_key and not cached and not cancelled and self.answer.strip():
+            response = f"<think>{self.thinking}</think>{self.answer}" if self.thinking else self.answer
+            self.chat.cache.put(self.cache_key, response.strip())
+
+
+class Conversation:
+    """
+    Multi-turn chat on /api/chat that keeps its history inside the model's context window.
+    
+    The history budget is num_ctx - num_predict (room for the reply). When a turn would exceed it,
+    the oldest turns are dropped down to low_water * budget instead of just below the limit, so the
+    message prefix stays unchanged for the next turns and Ollama can reuse its KV cache for it.
+    With summarize=True the dropped turns are folded into a short running summary instead.
+    """
+    THINK_BLOCK = re.compile(r"<think>.*?</think>\s*", re.DOTALL)
+    CHARS_PER_TOKEN = 4        # Rough estimate until the server reports real counts
+    MESSAGE_OVERHEAD = 4       # Role / template tokens per message
+    
+    def __init__(self, chat, system_prompt=None, num_ctx=None, num_predict=None, low_water=0.6, summarize=False, keep_alive=None):
+        self.chat = chat
+        self.system_prompt = system_prompt
+        options = chat.build_options()
+        self.options = options
+        if num_ctx: options["num_ctx"] = num_ctx
+        if num_predict: options["num_predict"] = num_predict
+        self.budget = options["num_ctx"] - options["num_predict"]
+        self.low_water = low_water
+        self.summarize = summarize
+        self.keep_alive = keep_alive if keep_alive is not None else chat.keep_alive
+        self.summary = ""
+        self.messages = []       # [{"role", "content", "tokens"}] without the system prompt
+        self.stats = {}          # Last turn: latency, prompt_tokens, eval_tokens, history_tokens, trimmed
+        self._chars_per_token = self.CHARS_PER_TOKEN
+    
+    def estimate_tokens(self, text) -> int:
+        return int(len(text) / self._chars_per_token) + self.MESSAGE_OVERHEAD
+    
+    def _system_message(self):
+        content = self.system_prompt or ""
+        if self.summary: content = f"{content}\n\nSummary of the earlier conversation:\n{self.summary}".strip()
+        return {"role": "system", "content": content} if content else None
+    
+    def history_tokens(self) -> int:
+        system = self._system_message()
+        return sum(m["tokens"] for m in self.messages) + (self.estimate_tokens(system["content"]) if system else 0)
+    
+    def _trim(self) -> int:
+        """Drop the oldest turns until the history fits; returns the number of dropped messages"""
+        if self.history_tokens() <= self.budget: return 0
+        target = self.budget * self.low_water
+        dropped = []
+        # Always keep the newest (pending) user message
+        while len(self.messages) > 1 and self.history_tokens() > target:
+            dropped.append(self.messages.pop(0))
+            # Never start the window with an assistant reply
+            while len(self.messages) > 1 and self.messages[0]["role"] != "user": dropped.append(self.messages.pop(0))
+        if dropped and self.summarize: self._summarize(dropped)
+        return len(dropped)
+    
+    def _summarize(self, dropped):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in dropped)
+        prompt = (f"Previous summary:\n{self.summary}\n\n" if self.summary else "") + \
+                 f"Conversation:\n{transcript}\n\nUpdate the summary in a few sentences, keeping facts and decisions."
+        try:
+            response = self.chat._post("/api/generate", {"model": self.chat.model, "prompt": prompt, "stream": False, "options": self.options})
+            if response.status_code == 200: self.summary = self.THINK_BLOCK.sub("", response.json().get("response", "")).strip()
+        except Exception as e: print(f"⚠️  Summary failed, dropped turns are lost: {e}")
+    
+    def send(self, message) -> str:
+        """Send one user turn and return the assistant reply ("" on error)"""
+        started = time.perf_counter()
+        self.messages.append({"role": "user", "content": message, "tokens": self.estimate_tokens(message)})
+        trimmed = self._trim()
+        
+        system = self._system_message()
+        payload = {
+            "model": self.chat.model,
+            "messages": ([system] if system else []) + [{"role": m["role"], "content": m["content"]} for m in self.messages],
+            "stream": False,
+            "options": self.options,
+        }
+        if self.keep_alive is not None: payload["keep_alive"] = self.keep_alive
+        
+        try:
+            response = self.chat._post("/api/chat", payload)
+            if response.status_code != 200:
+                self.messages.pop()
+                self.chat._record("chat", message, "", started, status=response.status_code)
+                return print(f"❌ API Error: {response.status_code}") or ""
+            data = response.json()
+        except Exception as e:
+            self.messages.pop()
+            print(f"❌ Error: {e}")
+            self.chat._record("chat", message, "", started, error=str(e))
+            return ""
+        
+        reply = data.get("message", {}).get("content", "")
+        # Reasoning is not sent back to the model, it would only eat the budget
+        content = self.THINK_BLOCK.sub("", reply).strip()
+        eval_tokens = data.get("eval_count")
+        self.messages.append({"role": "assistant", "content": content,
+                              "tokens": self.estimate_tokens(content) if eval_tokens is None or content != reply.strip() else eval_tokens + self.MESSAGE_OVERHEAD})
+        
+        # Calibrate the estimate when the server evaluated the whole prompt
+        prompt_tokens = data.get("prompt_eval_count")
+        if prompt_tokens and trimmed == 0 and len(self.messages) <= 2:
+            chars = sum(len(m["content"]) for m in payload["messages"])
+            overhead = self.MESSAGE_OVERHEAD * len(payload["messages"])
+            if prompt_tokens > overhead and chars: self._chars_per_token = max(1.0, chars / (prompt_tokens - overhead))
+        
+        self.stats = {
+            "latency": round(time.perf_counter() - started, 4),
+            "prompt_tokens": prompt_tokens,
+            "eval_tokens": eval_tokens,
+            "history_tokens": self.history_tokens(),
+            "trimmed": trimmed,
+        }
+        self.chat._record("chat", message, reply.strip(), started, data, history_tokens=self.stats["history_tokens"], trimmed=trimmed)
+        return reply.strip()
+    
+    def reset(self):
+        self.messages.clear()
+        self.summary = ""
 
 
 # Simple usage example